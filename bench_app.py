@@ -0,0 +1,160 @@
+"""Rerun latency of the app's pages, measured headless with Streamlit's AppTest.
+
+A synthetic ``user_data/`` is built in a temporary directory: one user with a
+share of the branch's topics ticked and some notes attached to every topic
+of the largest subject. Each page is then rerun repeatedly in one session
+and the latency percentiles are reported::
+
+    python bench_app.py
+    python bench_app.py --branch ee --checked 0.8 --notes 6
+    python bench_app.py --save-baseline bench_baseline.json   # record
+    python bench_app.py --baseline bench_baseline.json        # compare
+
+When compared, a page whose median is more than ``--tolerance`` slower than
+in the baseline is reported as a regression and the exit status is 1.
+Timings include AppTest's own overhead, so compare runs on the same machine.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCH_USER = "bench"
+PAGES = ["login", "home", "subjects", "topics", "topic_notes"]
+
+
+def build_fixture(branch, checked, notes_per_topic, seed=0):
+    """Fill ``user_data/`` in the current directory; return the benchmarked subject."""
+    from blobstore import get_blob_store
+    from notes_index import get_notes_index
+    from progress_store import get_store
+    from synth_data import png_bytes
+    from user_directory import get_user_directory, hash_password
+
+    rng = random.Random(seed)
+    get_user_directory().insert_hashed(BENCH_USER, hash_password("bench"))
+    bits = 0
+    for topic in branch.topics.values():
+        if rng.random() < checked:
+            bits |= topic.bit
+    store = get_store()
+    store.set_bits(BENCH_USER, branch.code, bits)
+    store.flush()
+
+    subject = max(branch.subjects, key=lambda subject: len(subject.topics))
+    blobs = get_blob_store()
+    index = get_notes_index()
+    for topic in subject.topics:
+        for n in range(notes_per_topic):
+            blob_id = blobs.add(png_bytes(topic.id * 1000 + n))
+            note = {"blob": blob_id, "name": f"note_{n}.png", "size": os.path.getsize(blobs.path(blob_id)), "uploaded": int(time.time())}
+            index.add(BENCH_USER, branch.code, topic.id, note)
+    return subject
+
+
+def _app(query=None, state=None):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(APP_DIR, "main.py"), default_timeout=60)
+    for name, value in (query or {}).items():
+        at.query_params[name] = value
+    for name, value in (state or {}).items():
+        at.session_state[name] = value
+    return at
+
+
+def time_page(at, runs):
+    """Run once to warm up, then return the latency of ``runs`` reruns in ms."""
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    samples = []
+    for _run in range(runs):
+        start = time.perf_counter()
+        at.run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def percentiles(samples):
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": statistics.median(samples), "p90": cuts[89], "p99": cuts[98], "max": max(samples)}
+
+
+def run_benchmark(branch_code, checked, notes_per_topic, runs, seed=0):
+    from syllabus import get_branch
+
+    branch = get_branch(branch_code)
+    subject = build_fixture(branch, checked, notes_per_topic, seed)
+    session = {"logged_in": True, "username": BENCH_USER}
+    first_topic = subject.topics[0]
+    apps = {
+        "login": _app(),
+        "home": _app({}, session),
+        "subjects": _app({"branch": branch.name}, session),
+        "topics": _app({"branch": branch.name, "subject": subject.name}, session),
+        "topic_notes": _app(
+            {"branch": branch.name, "subject": subject.name},
+            {**session, f"open_notes_topic_{branch.code}_{first_topic.id}": True},
+        ),
+    }
+    return {page: percentiles(time_page(apps[page], runs)) for page in PAGES}
+
+
+def compare(results, baseline, tolerance):
+    """Return the pages whose median is more than ``tolerance`` slower than the baseline."""
+    regressions = []
+    for page, stats in results.items():
+        before = baseline.get(page)
+        if before and stats["p50"] > before["p50"] * (1 + tolerance):
+            regressions.append(page)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure page rerun latency with AppTest")
+    parser.add_argument("--branch", default="cse")
+    parser.add_argument("--checked", type=float, default=0.5, help="share of topics ticked")
+    parser.add_argument("--notes", type=int, default=3, help="notes per topic of the largest subject")
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", help="JSON file with earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed median slowdown, e.g. 0.2 = 20%%")
+    parser.add_argument("--save-baseline", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    baseline_path = args.baseline and os.path.abspath(args.baseline)
+    save_path = args.save_baseline and os.path.abspath(args.save_baseline)
+    sys.path.insert(0, APP_DIR)
+    os.chdir(tempfile.mkdtemp(prefix="studysync-bench-"))
+    results = run_benchmark(args.branch, args.checked, args.notes, args.runs, args.seed)
+
+    baseline = {}
+    if baseline_path:
+        with open(baseline_path, "r") as f:
+            baseline = json.load(f)["pages"]
+    print(f"{'page':<12} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}  (ms, {args.runs} reruns)")
+    for page, stats in results.items():
+        line = f"{page:<12} " + " ".join(f"{stats[name]:8.1f}" for name in ("p50", "p90", "p99", "max"))
+        if page in baseline:
+            line += f"  {stats['p50'] / baseline[page]['p50'] - 1:+.0%} vs baseline"
+        print(line)
+
+    if save_path:
+        params = {"branch": args.branch, "checked": args.checked, "notes": args.notes, "runs": args.runs, "seed": args.seed}
+        with open(save_path, "w") as f:
+            json.dump({"params": params, "pages": results}, f, indent=2)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"Regressions over {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""Content-addressed storage for uploaded notes.
+
+Every distinct file is stored once, as ``user_data/.blobs/<aa>/<sha256><ext>``,
+however many topics or users it is attached to. ``index.db`` keeps a
+reference count per blob; the file is removed when its last reference is
+released.
+
+Uploads are streamed into a temp file in fixed-size chunks, hashed and
+checked in the same pass, so no upload is ever held in memory twice and a
+rejected or failed upload leaves nothing behind.
+"""
+import contextlib
+import hashlib
+import io
+import os
+import tempfile
+import time
+
+from fileio import fsync_dir
+from metrics import incr
+from singleton import lazy_singleton
+from sqlite_db import SqliteDatabase
+from thumbnails import remove_thumbnail
+
+BLOB_DIR = os.path.join("user_data", ".blobs")
+CHUNK_SIZE = 1024 * 1024
+# Temp files older than this (seconds) were left by a crashed process
+STALE_TEMP_AGE = 3600
+
+# Leading bytes of the image types we accept, mapped to the stored extension
+IMAGE_SIGNATURES = {
+    b"\x89PNG\r\n\x1a\n": ".png",
+    b"\xff\xd8\xff": ".jpg",
+}
+
+
+def sniff_extension(head):
+    for signature, extension in IMAGE_SIGNATURES.items():
+        if head.startswith(signature):
+            return extension
+    return None
+
+
+def blob_id_of(path):
+    """Return the id a file would be stored under, or None if it isn't an image."""
+    digest = hashlib.sha256()
+    extension = None
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            if extension is None:
+                extension = sniff_extension(chunk[:16])
+                if extension is None:
+                    return None
+            digest.update(chunk)
+    return digest.hexdigest() + extension if extension else None
+
+
+class BlobTooLarge(ValueError):
+    pass
+
+
+class BlobStore(SqliteDatabase):
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS blobs (
+            id   TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            refs INTEGER NOT NULL
+        ) WITHOUT ROWID;
+    """
+
+    AUTOCOMMIT = True
+
+    def __init__(self, root=BLOB_DIR):
+        self.root = root
+        super().__init__(os.path.join(root, "index.db"))
+        self._remove_stale_temp_files()
+
+    def _remove_stale_temp_files(self):
+        cutoff = time.time() - STALE_TEMP_AGE
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.startswith(".tmp-") and os.path.getmtime(path) < cutoff:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+
+    def path(self, blob_id):
+        return os.path.join(self.root, blob_id[:2], blob_id)
+
+    def add(self, data):
+        """Store ``data`` (if new) and take a reference to it; return the blob id."""
+        return self.add_stream(io.BytesIO(data))[0]
+
+    def add_stream(self, fileobj, max_bytes=None, exclude=()):
+        """Stream ``fileobj`` into the store and take a reference to it.
+
+        Returns ``(blob_id, size, added)``. When the content hashes to an id in
+        ``exclude`` nothing is stored, no reference is taken and ``added`` is
+        False. Raises ``BlobTooLarge`` past ``max_bytes`` and ``ValueError``
+        for anything that isn't a PNG or JPEG image.
+        """
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=self.root)
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            extension = None
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = fileobj.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if extension is None:
+                        extension = sniff_extension(chunk[:16])
+                        if extension is None:
+                            raise ValueError("Only PNG and JPEG images can be stored")
+                    size += len(chunk)
+                    if max_bytes is not None and size > max_bytes:
+                        raise BlobTooLarge(f"File is larger than {max_bytes / (1024 * 1024):g} MB")
+                    digest.update(chunk)
+                    out.write(chunk)
+                if extension is None:
+                    raise ValueError("File is empty")
+                out.flush()
+                os.fsync(out.fileno())
+
+            blob_id = digest.hexdigest() + extension
+            if blob_id in exclude:
+                return blob_id, size, False
+            with self._transaction() as conn:
+                path = self.path(blob_id)
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    os.replace(tmp_path, path)
+                    fsync_dir(os.path.dirname(path))
+                    incr("bytes_written", size)
+                conn.execute(
+                    "INSERT INTO blobs (id, size, refs) VALUES (?, ?, 1) "
+                    "ON CONFLICT (id) DO UPDATE SET refs = refs + 1",
+                    (blob_id, size),
+                )
+            return blob_id, size, True
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_path)
+
+    def exists(self, blob_id):
+        return os.path.exists(self.path(blob_id))
+
+    def retain(self, blob_id):
+        """Take another reference to a stored blob; False if it isn't stored."""
+        with self._transaction() as conn:
+            if not self.exists(blob_id):
+                return False
+            cursor = conn.execute("UPDATE blobs SET refs = refs + 1 WHERE id = ?", (blob_id,))
+            return cursor.rowcount == 1
+
+    def release(self, blob_id):
+        """Drop one reference; delete the blob when none are left."""
+        with self._transaction() as conn:
+            conn.execute("UPDATE blobs SET refs = refs - 1 WHERE id = ?", (blob_id,))
+            row = conn.execute("SELECT refs FROM blobs WHERE id = ?", (blob_id,)).fetchone()
+            if row is None or row[0] > 0:
+                return
+            conn.execute("DELETE FROM blobs WHERE id = ?", (blob_id,))
+            path = self.path(blob_id)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            remove_thumbnail(path)
+
+
+get_blob_store = lazy_singleton(BlobStore)
@@ -0,0 +1,22 @@
+"""Branch checklist modules, keyed by ``st.session_state.selected_branch``.
+
+Modules are imported the first time their branch is opened, so the login
+and branch selection pages don't pay for any of them.
+"""
+import importlib
+
+BRANCH_MODULES = {
+    "CSE": "cse",
+    "ECE": "ece",
+    "EE": "ee",
+    "CE": "ce",
+    "ME": "me",
+}
+
+
+def load_branch(name):
+    """Return the checklist module for ``name``, or None for an unknown branch."""
+    module_name = BRANCH_MODULES.get(name)
+    if module_name is None:
+        return None
+    return importlib.import_module(module_name)
@@ -0,0 +1,71 @@
+"""Bounded in-process caches.
+
+``LRUCache`` keeps at most ``maxsize`` entries and drops the least recently
+used one when full. Hits, misses and evictions are counted per cache and
+also reported to ``metrics`` as ``<name>_cache_hits`` etc., so they show up
+in the debug panel and the Prometheus export.
+
+Callers own invalidation: whoever writes the underlying data calls
+``invalidate`` or ``put`` with the new value.
+"""
+import collections
+import threading
+
+from metrics import incr
+
+_MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, name, maxsize):
+        self.name = name
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        incr(f"{self.name}_cache_{'misses' if value is _MISSING else 'hits'}")
+        return default if value is _MISSING else value
+
+    def put(self, key, value):
+        evicted = 0
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                evicted += 1
+            self.evictions += evicted
+        if evicted:
+            incr(f"{self.name}_cache_evictions", evicted)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,123 @@
+"""Progress charts for the subject overview.
+
+Rings are drawn as small inline SVGs by default. Set
+``STUDYSYNC_CHART_RENDERER=plotly`` (or pass ``renderer="plotly"``) to get the
+interactive Plotly donut instead.
+"""
+import math
+import os
+from functools import lru_cache
+
+import streamlit as st
+
+from metrics import span
+
+CHART_RENDERER = os.environ.get("STUDYSYNC_CHART_RENDERER", "svg").lower()
+
+RING_SIZE = 70
+RING_HOLE = 0.7  # inner radius as a fraction of the outer one, like the Plotly donut
+RING_THEMES = {
+    "dark": {"fill": "#00bfff", "track": "#2f2f3f", "text": "white"},
+    "light": {"fill": "#00bfff", "track": "#dcdce6", "text": "#1f1f2e"},
+}
+
+
+def current_theme():
+    return "light" if st.get_option("theme.base") == "light" else "dark"
+
+
+@lru_cache(maxsize=512)
+def ring_svg(percent, theme="dark"):
+    """Return the SVG markup of a progress ring; ``percent`` is a whole number."""
+    colors = RING_THEMES[theme]
+    outer = RING_SIZE / 2
+    width = outer * (1 - RING_HOLE)
+    radius = outer - width / 2
+    circumference = 2 * math.pi * radius
+    filled = circumference * max(0, min(percent, 100)) / 100
+    return (
+        f'<svg width="{RING_SIZE}" height="{RING_SIZE}" viewBox="0 0 {RING_SIZE} {RING_SIZE}" '
+        f'xmlns="http://www.w3.org/2000/svg">'
+        f'<circle cx="{outer}" cy="{outer}" r="{radius:.2f}" fill="none" '
+        f'stroke="{colors["track"]}" stroke-width="{width:.2f}"/>'
+        f'<circle cx="{outer}" cy="{outer}" r="{radius:.2f}" fill="none" '
+        f'stroke="{colors["fill"]}" stroke-width="{width:.2f}" '
+        f'stroke-dasharray="{filled:.2f} {circumference:.2f}" '
+        f'transform="rotate(-90 {outer} {outer})"/>'
+        f'<text x="50%" y="50%" dominant-baseline="central" text-anchor="middle" '
+        f'font-family="sans-serif" font-size="14" font-weight="bold" '
+        f'fill="{colors["text"]}">{percent}%</text>'
+        f'</svg>'
+    )
+
+
+def plotly_ring(percent, key):
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Pie(
+        values=[percent, 100 - percent],
+        hole=RING_HOLE,
+        marker_colors=[RING_THEMES["dark"]["fill"], RING_THEMES["dark"]["track"]],
+        direction="clockwise",
+        sort=False,
+        textinfo='none'
+    ))
+    fig.update_layout(
+        margin=dict(t=0, b=0, l=0, r=0),
+        width=RING_SIZE,
+        height=RING_SIZE,
+        paper_bgcolor="rgba(0,0,0,0)",
+        annotations=[{
+            "text": f"<b>{int(percent)}%</b>",
+            "font": {"size": 14, "color": "white"},
+            "xref": "paper",
+            "yref": "paper",
+            "showarrow": False
+        }]
+    )
+    st.plotly_chart(fig, use_container_width=False, key=key)
+
+
+# ✅ Draw circular progress bar
+def circular_progress(percent, key, renderer=None):
+    with span("chart_render"):
+        if (renderer or CHART_RENDERER) == "plotly":
+            plotly_ring(percent, key)
+        else:
+            st.markdown(ring_svg(int(percent), current_theme()), unsafe_allow_html=True)
+
+
+VELOCITY_WIDTH = 240
+VELOCITY_HEIGHT = 40
+
+
+def velocity_svg(series, theme="dark"):
+    """Return a compact SVG bar chart of daily completions, oldest day first."""
+    colors = RING_THEMES[theme]
+    step = VELOCITY_WIDTH / max(len(series), 1)
+    top = max(max(series, default=0), 1)
+    bars = []
+    for i, count in enumerate(series):
+        height = VELOCITY_HEIGHT * max(count, 0) / top
+        # Empty days keep a thin track-coloured stub so gaps in a streak show
+        if height < 2:
+            bars.append(
+                f'<rect x="{i * step + 1:.1f}" y="{VELOCITY_HEIGHT - 2}" width="{step - 2:.1f}" '
+                f'height="2" fill="{colors["track"]}"/>'
+            )
+        else:
+            bars.append(
+                f'<rect x="{i * step + 1:.1f}" y="{VELOCITY_HEIGHT - height:.1f}" width="{step - 2:.1f}" '
+                f'height="{height:.1f}" fill="{colors["fill"]}"><title>{count}</title></rect>'
+            )
+    return (
+        f'<svg width="{VELOCITY_WIDTH}" height="{VELOCITY_HEIGHT}" '
+        f'viewBox="0 0 {VELOCITY_WIDTH} {VELOCITY_HEIGHT}" xmlns="http://www.w3.org/2000/svg">'
+        + "".join(bars) + '</svg>'
+    )
+
+
+# ✅ Draw daily completions bar chart
+def velocity_chart(series):
+    with span("chart_render"):
+        st.markdown(velocity_svg(series, current_theme()), unsafe_allow_html=True)
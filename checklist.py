@@ -0,0 +1,128 @@
+import streamlit as st
+import time
+import navigation
+from charts import circular_progress, velocity_chart
+from metrics import span
+from notes import show_topic_notes
+from notes_index import get_notes_index
+from progress_store import get_store
+from revision import get_scheduler
+from syllabus import get_branch
+from velocity import get_velocity_tracker
+
+HISTORY_ROWS = 10
+
+
+def _topic_changed(username, code, topic_id, done):
+    if done:
+        get_scheduler().topic_completed(username, code, topic_id)
+    else:
+        get_scheduler().topic_cleared(username, code, topic_id)
+    get_velocity_tracker().record(username, code, done)
+
+
+def _save_topic(username, code, topic_id, key):
+    done = st.session_state[key]
+    # Only real changes count towards revision cards and velocity
+    if get_store().set_topic(username, code, topic_id, done):
+        _topic_changed(username, code, topic_id, done)
+
+
+def _undo(username, code):
+    event = get_store().undo(username, code)
+    if event and "t" in event:
+        _topic_changed(username, code, event["t"], event["d"])
+
+
+def _show_velocity(username, branch, bits):
+    stats = get_velocity_tracker().stats(username, branch.code, len(branch.topics) - (bits & branch.mask).bit_count())
+    if not any(stats["series"]) and not stats["longest_streak"]:
+        return
+    velocity_chart(stats["series"])
+    if stats["finish"]:
+        finish = f"finish ≈ {stats['finish']:%d %b %Y}"
+    else:
+        finish = "no finish projected yet"
+    st.caption(
+        f"🔥 {stats['streak']}-day streak (best {stats['longest_streak']}) · "
+        f"{stats['velocity_7']:.1f}/day this week · {stats['velocity_30']:.1f}/day over 30 days · {finish}"
+    )
+
+
+def _show_history(store, username, branch):
+    # Only the event-log backend keeps a history to show and undo.
+    events = store.history(username, branch.code, limit=HISTORY_ROWS)
+    if not events:
+        return
+    st.button("↩️ Undo last change", key=f"undo_{branch.code}", on_click=_undo, args=(username, branch.code))
+    with st.expander("🕘 Recent changes"):
+        for event in events:
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(event["ts"]))
+            if "bits" in event:
+                what = "progress replaced"
+            else:
+                topic = branch.topic(event["t"])
+                what = f"{'✅' if event['d'] else '⬜'} {topic.name if topic else event['t']}"
+            if "undo" in event:
+                what += " (undo)"
+            st.caption(f"{when} · {what}")
+
+
+# ✅ Checklist page shared by every branch
+def show_checklist(branch_code):
+    branch = get_branch(branch_code)
+    code = branch.code
+    st.title(branch.title)
+
+    username = st.session_state.get("username", "guest")
+
+    store = get_store()
+    with span("progress_load"):
+        bits = store.load_bits(username, code)
+    with span("notes_index"):
+        note_counts = get_notes_index().counts(username, code)
+
+    if "selected_subject" not in st.session_state:
+        st.session_state.selected_subject = None
+
+    if st.session_state.selected_subject is not None and branch.subject(st.session_state.selected_subject) is None:
+        navigation.replace(branch=branch.name)
+
+    if st.session_state.selected_subject is None:
+        _show_velocity(username, branch, bits)
+        st.markdown("### Select a Subject")
+        for subject in branch.subjects:
+            col1, col2 = st.columns([5, 1])
+            with col1:
+                st.button(subject.name, key=f"btn_{subject.name}_{code}", on_click=navigation.go_to, kwargs={"branch": branch.name, "subject": subject.name})
+                subject_notes = sum(note_counts.get(topic.id, 0) for topic in subject.topics)
+                if subject_notes:
+                    st.caption(f"📎 {subject_notes} note{'s' if subject_notes != 1 else ''}")
+            with col2:
+                circular_progress(subject.percent(bits), key=f"chart_{subject.name}_{code}")
+
+    else:
+        subject = branch.subject(st.session_state.selected_subject)
+        st.markdown(f"### 📘 {subject.name} Topics")
+
+        for topic in subject.topics:
+            key = f"topic_{code}_{topic.id}"
+            # The store is the source of truth: a tick made in another tab
+            # must not be undone by this session's stale widget value.
+            st.session_state[key] = bool(bits & topic.bit)
+            st.checkbox(topic.name, key=key, on_change=_save_topic, args=(username, code, topic.id, key))
+
+            # Notes are only rendered for topics the user opened
+            label = "📎 Upload/View Notes"
+            if note_counts.get(topic.id):
+                label += f" ({note_counts[topic.id]})"
+            if st.toggle(label, key=f"open_notes_{key}"):
+                with st.container(border=True):
+                    show_topic_notes(username, code, topic, key)
+
+        if hasattr(store, "history"):
+            _show_history(store, username, branch)
+
+        st.button("🔙 Back to Subjects", on_click=navigation.go_to, kwargs={"branch": branch.name}, key=f"back_to_subjects_{code}")
+
+    st.button("🔙 Back to Branch Selection", on_click=navigation.go_to, key=f"back_to_branch_{code}")
@@ -0,0 +1,159 @@
+"""Cohort analytics over every user's saved progress.
+
+For each branch the users' bitsets are unpacked into one NumPy
+``users x topics`` matrix whose columns follow the syllabus order, and all
+statistics are computed on whole arrays::
+
+    python cohort_analytics.py --out analytics
+    python cohort_analytics.py --branch cse --format parquet
+
+Three tables are written per branch:
+
+* ``<branch>_topics``    - share of users who completed each topic
+* ``<branch>_subjects``  - mean completion per subject, weakest first, and how
+  often each subject is a user's weakest
+* ``<branch>_readiness`` - users per 10% band of overall branch completion
+
+Only users with saved progress in a branch are counted for that branch.
+Parquet output needs ``pyarrow``.
+"""
+import argparse
+import csv
+import os
+
+import numpy as np
+
+from progress_store import SQLITE_PATH, USER_DATA_DIR, EventLogProgressStore, JsonProgressStore, SqliteProgressStore
+from syllabus import branches, get_branch
+
+READINESS_BANDS = 10
+
+
+def progress_matrix(branch, users_bits):
+    """Return ``(usernames, matrix)`` from ``(username, bits)`` pairs.
+
+    ``matrix[u, t]`` is 1 when user ``u`` completed the ``t``-th topic of the
+    branch in syllabus order.
+    """
+    usernames = []
+    packed = []
+    topic_ids = np.fromiter(branch.topics, dtype=np.intp, count=len(branch.topics))
+    width = (int(topic_ids.max()) + 8) // 8
+    for username, bits in users_bits:
+        usernames.append(username)
+        packed.append((bits & branch.mask).to_bytes(width, "little"))
+    rows = np.frombuffer(b"".join(packed), dtype=np.uint8).reshape(len(usernames), width)
+    return usernames, np.unpackbits(rows, axis=1, bitorder="little")[:, topic_ids]
+
+
+def _subject_starts(branch):
+    starts = np.cumsum([0] + [len(subject.topics) for subject in branch.subjects[:-1]])
+    sizes = np.array([len(subject.topics) for subject in branch.subjects])
+    return starts, sizes
+
+
+def topic_table(branch, matrix):
+    users = matrix.shape[0]
+    completed = matrix.sum(axis=0, dtype=np.int64)
+    topics = list(branch.topics.values())
+    return {
+        "subject": [topic.subject for topic in topics],
+        "topic_id": [topic.id for topic in topics],
+        "topic": [topic.name for topic in topics],
+        "completed": completed.tolist(),
+        "users": [users] * len(topics),
+        "rate": np.round(completed / max(users, 1), 4).tolist(),
+    }
+
+
+def subject_table(branch, matrix):
+    users = matrix.shape[0]
+    starts, sizes = _subject_starts(branch)
+    # users x subjects share of each subject's topics completed
+    per_user = np.add.reduceat(matrix, starts, axis=1, dtype=np.int64) / sizes
+    mean = per_user.sum(axis=0) / max(users, 1)
+    weakest = np.bincount(per_user.argmin(axis=1), minlength=len(sizes)) if users else np.zeros(len(sizes), dtype=np.int64)
+    finished = (per_user == 1).sum(axis=0)
+    order = np.argsort(mean, kind="stable")
+    return {
+        "subject": [branch.subjects[i].name for i in order],
+        "topics": sizes[order].tolist(),
+        "mean_completion": np.round(mean[order], 4).tolist(),
+        "weakest_share": np.round(weakest[order] / max(users, 1), 4).tolist(),
+        "users_finished": finished[order].tolist(),
+    }
+
+
+def readiness_table(branch, matrix):
+    users = matrix.shape[0]
+    overall = matrix.sum(axis=1, dtype=np.int64) / len(branch.topics)
+    bands = np.minimum((overall * READINESS_BANDS).astype(np.intp), READINESS_BANDS - 1)
+    counts = np.bincount(bands, minlength=READINESS_BANDS)
+    step = 100 // READINESS_BANDS
+    return {
+        "band": [f"{low}-{low + step}%" for low in range(0, 100, step)],
+        "users": counts.tolist(),
+        "share": np.round(counts / max(users, 1), 4).tolist(),
+    }
+
+
+def analyze(store, branch_codes=None):
+    """Return ``{name: table}`` with the three tables of every branch."""
+    tables = {}
+    for branch in [get_branch(code) for code in branch_codes] if branch_codes else branches():
+        _usernames, matrix = progress_matrix(branch, store.iter_bits(branch.code))
+        tables[f"{branch.code}_topics"] = topic_table(branch, matrix)
+        tables[f"{branch.code}_subjects"] = subject_table(branch, matrix)
+        tables[f"{branch.code}_readiness"] = readiness_table(branch, matrix)
+    return tables
+
+
+def write_csv(path, table):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(table)
+        writer.writerows(zip(*table.values()))
+
+
+def write_parquet(path, table):
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit("Parquet output needs pyarrow: pip install pyarrow")
+    pyarrow.parquet.write_table(pyarrow.table(table), path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Completion statistics across all users")
+    parser.add_argument("--backend", choices=["json", "sqlite", "events"], default=os.environ.get("STUDYSYNC_PROGRESS_BACKEND", "json").lower())
+    parser.add_argument("--data-dir", default=USER_DATA_DIR)
+    parser.add_argument("--db", default=os.environ.get("STUDYSYNC_PROGRESS_DB", SQLITE_PATH))
+    parser.add_argument("--branch", action="append", help="branch code, repeatable (default: all)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--out", default="analytics")
+    args = parser.parse_args(argv)
+
+    if args.backend == "sqlite":
+        store = SqliteProgressStore(args.db)
+    elif args.backend == "events":
+        store = EventLogProgressStore(args.data_dir)
+    else:
+        store = JsonProgressStore(args.data_dir)
+    tables = analyze(store, args.branch)
+    os.makedirs(args.out, exist_ok=True)
+    write = write_parquet if args.format == "parquet" else write_csv
+    for name, table in tables.items():
+        write(os.path.join(args.out, f"{name}.{args.format}"), table)
+
+    for name, table in tables.items():
+        if name.endswith("_subjects"):
+            branch = name[:-len("_subjects")]
+            users = sum(tables[f"{branch}_readiness"]["users"])
+            weakest = table["subject"][0] if users else "-"
+            print(f"{branch}: {users} users, weakest subject: {weakest}")
+    print(f"Wrote {len(tables)} tables to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
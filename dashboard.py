@@ -0,0 +1,22 @@
+import streamlit as st
+import syllabus
+from progress_store import get_store
+
+
+# ✅ Progress across all branches, read from the per-user summary counters
+def show_dashboard(username):
+    summary = get_store().summary(username)
+
+    st.markdown("#### 📊 Your Progress Across Branches")
+    for branch in syllabus.branches():
+        counts = summary.get(branch.code, {})
+        completed = sum(counts.values())
+        total = len(branch.topics)
+        st.progress(completed / total if total else 0, text=f"{branch.label} — {completed}/{total} topics")
+        if completed:
+            with st.expander(f"{branch.name} by subject"):
+                rows = "\n".join(
+                    f"| {subject.name} | {counts.get(subject.name, 0)}/{len(subject.topics)} |"
+                    for subject in branch.subjects
+                )
+                st.markdown(f"| Subject | Completed |\n|---|---|\n{rows}")
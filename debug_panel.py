@@ -0,0 +1,15 @@
+import streamlit as st
+from metrics import get_metrics
+
+
+# ✅ Sidebar table of stage timings and counters for this server process
+def show_debug_panel():
+    spans, counters = get_metrics().snapshot()
+    with st.sidebar.expander("🛠 Debug metrics", expanded=False):
+        rows = "\n".join(
+            f"| {name} | {stats['count']} | {stats[0.5] * 1000:.1f} | {stats[0.99] * 1000:.1f} |"
+            for name, stats in spans.items()
+        )
+        st.markdown(f"| Stage | Count | p50 ms | p99 ms |\n|---|---:|---:|---:|\n{rows}")
+        for name, value in counters.items():
+            st.caption(f"{name}: {value:,}")
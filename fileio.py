@@ -0,0 +1,93 @@
+"""Small file helpers shared by the storage modules."""
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+from metrics import incr
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def fsync_dir(directory):
+    # Persist the rename itself; directories can't be opened on Windows.
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path, data):
+    """Write ``data`` to ``path`` via temp file + fsync + rename.
+
+    Readers see either the old file or the new one, never a truncated mix.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        incr("bytes_written", len(data))
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    fsync_dir(directory)
+
+
+def atomic_write_json(path, data):
+    atomic_write_bytes(path, json.dumps(data).encode("utf-8"))
+
+
+def read_json(path, default=None):
+    """Load JSON from ``path``; missing files give ``default``.
+
+    A file that fails to parse is moved aside as ``<name>.corrupt-<ts>``
+    instead of being silently overwritten, so the data can still be recovered.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        incr("bytes_read", len(data))
+        return json.loads(data)
+    except FileNotFoundError:
+        return default
+    except json.JSONDecodeError:
+        quarantined = f"{path}.corrupt-{int(time.time())}"
+        os.replace(path, quarantined)
+        logger.warning("Corrupt JSON file %s moved to %s", path, quarantined)
+        return default
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """Hold an exclusive cross-process lock on ``path`` (created if needed).
+
+    Lock files are separate from the data they guard, because the data files
+    are replaced by rename and a lock on the old inode would be lost.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
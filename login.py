@@ -1,20 +1,22 @@
 import streamlit as st
-import json
-import os
+from session_tokens import SESSION_COOKIE, SESSION_TTL, get_session_store
+from user_directory import get_user_directory
 
-USERS_FILE = "users.json"
 
-# Load existing users
-def load_users():
-    if not os.path.exists(USERS_FILE):
-        return {}
-    with open(USERS_FILE, "r") as f:
-        return json.load(f)
+def _set_session_cookie(token, max_age):
+    # Streamlit can't set cookies itself, so the browser does it
+    secure = "(location.protocol === 'https:' ? '; Secure' : '')"
+    st.html(
+        f"<script>document.cookie = '{SESSION_COOKIE}={token}; path=/; max-age={max_age}; SameSite=Strict' + {secure};</script>",
+        unsafe_allow_javascript=True,
+    )
+
+
+def _start_session(username):
+    st.session_state.logged_in = True
+    st.session_state.username = username
+    st.session_state.new_session_token = get_session_store().issue(username)
 
-# Save users to file
-def save_users(users):
-    with open(USERS_FILE, "w") as f:
-        json.dump(users, f)
 
 def login_signup():
     if "logged_in" not in st.session_state:
@@ -24,21 +26,37 @@ def login_signup():
 
     # If already logged in, return True
     if st.session_state.logged_in:
+        token = st.session_state.pop("new_session_token", None)
+        if token:
+            _set_session_cookie(token, SESSION_TTL)
         return True
 
+    # 🔗 Logout link, or a reload with a session cookie
+    cookie = st.context.cookies.get(SESSION_COOKIE)
+    if "logout" in st.query_params:
+        get_session_store().revoke(cookie)
+        _set_session_cookie("", 0)
+        st.query_params.clear()
+    else:
+        token_user = get_session_store().verify(cookie)
+        if token_user and get_user_directory().exists(token_user):
+            st.session_state.logged_in = True
+            st.session_state.username = token_user
+            return True
+
     st.title("🔐 StudySync Login / Sign Up")
 
     mode = st.radio("Choose an option:", ["Login", "Sign Up"], horizontal=True)
-    users = load_users()
 
     username = st.text_input("Username")
     password = st.text_input("Password", type="password")
 
     if mode == "Login":
         if st.button("Login"):
-            if username in users and users[username] == password:
-                st.session_state.logged_in = True
-                st.session_state.username = username
+            with st.spinner("Checking credentials..."):
+                valid = get_user_directory().verify(username, password)
+            if valid:
+                _start_session(username)
                 st.success(f"✅ Welcome, {username}!")
                 st.rerun()
             else:
@@ -46,15 +64,12 @@ def login_signup():
 
     else:  # Sign Up
         if st.button("Sign Up"):
-            if username in users:
-                st.warning("⚠️ Username already exists. Try a different one.")
-            elif not username or not password:
+            if not username or not password:
                 st.warning("⚠️ Please enter both username and password.")
+            elif not get_user_directory().create(username, password):
+                st.warning("⚠️ Username already exists. Try a different one.")
             else:
-                users[username] = password
-                save_users(users)
-                st.session_state.logged_in = True  # 🔐 Auto-login
-                st.session_state.username = username
+                _start_session(username)  # 🔐 Auto-login
                 st.success(f"✅ Account created successfully! Logging in as {username}...")
                 st.rerun()
 
@@ -1,11 +1,23 @@
 import streamlit as st
 from login import login_signup
-import cse, ece, ee, me, ce
+from branches import load_branch
+from debug_panel import show_debug_panel
+import metrics
+import navigation
+import syllabus
 
 # 🔐 Login Page
-if not login_signup():
+with metrics.span("page.login"):
+    logged_in = login_signup()
+if not logged_in:
     st.stop()
 
+# Home page features, imported only once past the login page
+from dashboard import show_dashboard
+from revise_today import show_revise_today
+from search_box import show_search_box
+from user_archive import export_to_tempfile
+
 # ✅ Initialize session state
 if "selected_branch" not in st.session_state:
     st.session_state.selected_branch = None
@@ -14,6 +26,9 @@ if "history" not in st.session_state:
 if "username" not in st.session_state:
     st.session_state.username = "User"
 
+# 🔗 Open the page named in the URL (reload or deep link)
+navigation.sync_from_url()
+
 # --- Navbar Layout ---
 with st.container():
     st.markdown("""
@@ -77,12 +92,8 @@ with st.container():
     col_back_btn, col_navbar_content = st.columns([0.15, 0.85])
 
     with col_back_btn:
-        if st.session_state.history:  # show back only if history exists
-            if st.button("🔙 Back", key="back_btn_main"):
-                prev_state = st.session_state.history.pop()  # get last state
-                st.session_state.selected_branch = prev_state.get("branch")
-                st.session_state.selected_subject = prev_state.get("subject", None)
-                st.rerun()
+        if navigation.can_go_back():  # show back only if history exists
+            st.button("🔙 Back", key="back_btn_main", on_click=navigation.go_back)
 
     with col_navbar_content:
         username = st.session_state.get("username", "User")
@@ -95,9 +106,7 @@ with st.container():
                     <span class="user-icon">👤</span> <b>{username}</b>
                 </div>
                 <div class="navbar-segment">
-                    <form onsubmit="return false;">
-                        <button class="logout-btn" onclick="window.location.reload()">Logout</button>
-                    </form>
+                    <a class="logout-btn" href="?logout=1" target="_self">Logout</a>
                 </div>
             </div>
         """, unsafe_allow_html=True)
@@ -105,53 +114,42 @@ with st.container():
 
 # ✅ Branch Selection
 if st.session_state.selected_branch is None:
-    st.title("📘 StudySync - GATE Prep Tracker")
-    st.markdown(f"### Welcome, **{st.session_state.username}** 👋")
-    st.markdown("#### Select your GATE Branch to continue:")
-
-    if st.button("💻 Computer Science and Engineering"):
-        st.session_state.history.append({"branch": None})  # save current state
-        st.session_state.selected_branch = "CSE"
-        st.rerun()
-
-    if st.button("📡 Electronics & Communication Engineering"):
-        st.session_state.history.append({"branch": None})
-        st.session_state.selected_branch = "ECE"
-        st.rerun()
-
-    if st.button("⚡ Electrical Engineering"):
-        st.session_state.history.append({"branch": None})
-        st.session_state.selected_branch = "EE"
-        st.rerun()
-
-    if st.button("🏗️ Civil Engineering"):
-        st.session_state.history.append({"branch": None})
-        st.session_state.selected_branch = "CE"
-        st.rerun()
-
-    if st.button("⚙️ Mechanical Engineering"):
-        st.session_state.history.append({"branch": None})
-        st.session_state.selected_branch = "ME"
-        st.rerun()
+    with metrics.span("page.home"):
+        st.title("📘 StudySync - GATE Prep Tracker")
+        st.markdown(f"### Welcome, **{st.session_state.username}** 👋")
+        show_search_box()
+        st.markdown("#### Select your GATE Branch to continue:")
+
+        for branch_info in syllabus.branches():
+            st.button(branch_info.label, on_click=navigation.go_to, kwargs={"branch": branch_info.name})
+
+        st.markdown("---")
+        show_revise_today(st.session_state.username)
+
+        st.markdown("---")
+        show_dashboard(st.session_state.username)
+
+        # 📦 Archive is only built when the button is clicked, outside this script run
+        export_user = st.session_state.username
+        st.download_button(
+            "⬇️ Download my data",
+            data=lambda: export_to_tempfile(export_user),
+            file_name=f"studysync-{export_user}.zip",
+            mime="application/zip",
+            on_click="ignore",
+        )
 
 # ✅ Checklist view
 else:
     branch = st.session_state.selected_branch
     try:
-        if branch == "CSE":
-            st.session_state.history.append({"branch": None})  # when going deeper
-            cse.show_checklist()
-        elif branch == "ECE":
-            st.session_state.history.append({"branch": None})
-            ece.show_checklist()
-        elif branch == "EE":
-            st.session_state.history.append({"branch": None})
-            ee.show_checklist()
-        elif branch == "CE":
-            st.session_state.history.append({"branch": None})
-            ce.show_checklist()
-        elif branch == "ME":
-            st.session_state.history.append({"branch": None})
-            me.show_checklist()
+        module = load_branch(branch)
+        if module is not None:
+            with metrics.span("page.checklist"):
+                module.show_checklist()
     except Exception as e:
         st.error(f"❌ Error loading branch checklist: {e}")
+
+# 🛠 Timings and counters, when STUDYSYNC_DEBUG_PANEL is set
+if metrics.DEBUG_PANEL:
+    show_debug_panel()
@@ -0,0 +1,157 @@
+"""Timing spans and counters for the app's hot paths.
+
+Wrap a stage in ``with span("progress_load"):`` to record how long it took,
+and count things with ``incr("bytes_read", n)``. The last ``SPAN_WINDOW``
+durations of every span are kept for percentiles; counters only grow.
+
+The numbers can be exported in Prometheus text format:
+
+* ``STUDYSYNC_METRICS_FILE``  - rewritten every ``STUDYSYNC_METRICS_INTERVAL``
+  seconds (default ``15``), e.g. for node_exporter's textfile collector
+* ``STUDYSYNC_METRICS_PORT``  - served at ``http://<host>:<port>/metrics``
+
+``STUDYSYNC_DEBUG_PANEL=1`` also shows them in the app's sidebar.
+"""
+import atexit
+import collections
+import contextlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from singleton import lazy_singleton
+
+logger = logging.getLogger(__name__)
+
+SPAN_WINDOW = 1024
+METRICS_FILE = os.environ.get("STUDYSYNC_METRICS_FILE")
+METRICS_INTERVAL = float(os.environ.get("STUDYSYNC_METRICS_INTERVAL", "15"))
+METRICS_PORT = os.environ.get("STUDYSYNC_METRICS_PORT")
+DEBUG_PANEL = os.environ.get("STUDYSYNC_DEBUG_PANEL", "").lower() in ("1", "true", "yes")
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _quantile(ordered, q):
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class Metrics:
+    def __init__(self, window=SPAN_WINDOW):
+        self._lock = threading.Lock()
+        self._samples = collections.defaultdict(lambda: collections.deque(maxlen=window))
+        self._totals = collections.defaultdict(lambda: [0, 0.0])  # span -> [count, seconds]
+        self._counters = collections.defaultdict(int)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            self._samples[name].append(seconds)
+            total = self._totals[name]
+            total[0] += 1
+            total[1] += seconds
+
+    @contextlib.contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def snapshot(self):
+        """Return ``(spans, counters)``; spans map to count, sum and quantiles in seconds."""
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+            totals = {name: tuple(total) for name, total in self._totals.items()}
+            counters = dict(self._counters)
+        spans = {}
+        for name, ordered in sorted(samples.items()):
+            count, seconds = totals[name]
+            spans[name] = {"count": count, "sum": seconds, **{q: _quantile(ordered, q) for q in QUANTILES}}
+        return spans, dict(sorted(counters.items()))
+
+    def prometheus_text(self):
+        spans, counters = self.snapshot()
+        lines = [
+            "# HELP studysync_span_seconds Time spent in instrumented stages.",
+            "# TYPE studysync_span_seconds summary",
+        ]
+        for name, stats in spans.items():
+            for q in QUANTILES:
+                lines.append(f'studysync_span_seconds{{stage="{name}",quantile="{q}"}} {stats[q]:.6f}')
+            lines.append(f'studysync_span_seconds_sum{{stage="{name}"}} {stats["sum"]:.6f}')
+            lines.append(f'studysync_span_seconds_count{{stage="{name}"}} {stats["count"]}')
+        for name, value in counters.items():
+            lines.append(f"# TYPE studysync_{name}_total counter")
+            lines.append(f"studysync_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_file(self, path):
+        directory = os.path.dirname(path) or "."
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+        with os.fdopen(fd, "w") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+
+def _export_file(metrics, path, interval):
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                metrics.write_file(path)
+            except OSError as e:
+                logger.warning("Could not write metrics to %s: %s", path, e)
+
+    threading.Thread(target=loop, name="metrics-file", daemon=True).start()
+    atexit.register(metrics.write_file, path)
+
+
+def _serve_http(metrics, port):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer(("", port), Handler)
+    except OSError as e:  # e.g. another worker already serves this port
+        logger.warning("Metrics endpoint not started on port %s: %s", port, e)
+        return
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+
+
+def _start_metrics():
+    metrics = Metrics()
+    if METRICS_FILE:
+        _export_file(metrics, METRICS_FILE, METRICS_INTERVAL)
+    if METRICS_PORT:
+        _serve_http(metrics, int(METRICS_PORT))
+    return metrics
+
+
+get_metrics = lazy_singleton(_start_metrics)
+
+
+def span(name):
+    return get_metrics().span(name)
+
+
+def incr(name, amount=1):
+    get_metrics().incr(name, amount)
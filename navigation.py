@@ -0,0 +1,81 @@
+"""Routing and back-button history shared by the home page and the branch
+checklists.
+
+A view is ``{"branch": ..., "subject": ...}`` and is mirrored in the URL as
+``?branch=CSE&subject=...``, so a reload or a shared link opens the same
+page directly. Buttons navigate through ``on_click`` callbacks (``go_to``,
+``go_back``), which run before the script, so each click costs one script
+run instead of two.
+
+``go_to`` pushes the view being left onto ``st.session_state.history`` and
+``go_back`` pops it. An entry that is already on the stack is moved to the
+top instead of being added twice, and only the newest ``MAX_HISTORY``
+entries are kept, so the history stays small however long a session runs.
+"""
+import streamlit as st
+from syllabus import get_branch
+
+MAX_HISTORY = 20
+
+
+def current_view():
+    return {
+        "branch": st.session_state.get("selected_branch"),
+        "subject": st.session_state.get("selected_subject"),
+    }
+
+
+def _show(view):
+    st.session_state.selected_branch = view.get("branch")
+    st.session_state.selected_subject = view.get("subject")
+    for name in ("branch", "subject"):
+        if view.get(name):
+            st.query_params[name] = view[name]
+        elif name in st.query_params:
+            del st.query_params[name]
+
+
+def view_from_url():
+    try:
+        branch = get_branch(st.query_params.get("branch", ""))
+    except KeyError:
+        return {"branch": None, "subject": None}
+    return {"branch": branch.name, "subject": st.query_params.get("subject") or None}
+
+
+def sync_from_url():
+    """Show the view named in the URL, e.g. after a reload or from a shared link."""
+    view = view_from_url()
+    if view != current_view():
+        _show(view)
+
+
+def replace(branch=None, subject=None):
+    """Switch view without adding a history entry."""
+    _show({"branch": branch, "subject": subject})
+
+
+def push(view):
+    history = [entry for entry in st.session_state.get("history", []) if entry != view]
+    history.append(view)
+    st.session_state.history = history[-MAX_HISTORY:]
+
+
+def can_go_back():
+    return bool(st.session_state.get("history"))
+
+
+def go_to(branch=None, subject=None):
+    """Open a view, remembering the current one for the Back button."""
+    view = {"branch": branch, "subject": subject}
+    current = current_view()
+    if view == current:
+        return
+    push(current)
+    _show(view)
+
+
+def go_back():
+    history = st.session_state.get("history", [])
+    if history:
+        _show(history.pop())
@@ -0,0 +1,109 @@
+import streamlit as st
+import math
+import os
+import time
+from blobstore import get_blob_store
+from metrics import incr, span
+from notes_index import get_notes_index
+from thumbnails import get_thumbnail
+
+NOTES_PER_PAGE = int(os.environ.get("STUDYSYNC_NOTES_PER_PAGE", "6"))
+# Upload limits, per file and per batch of files submitted together
+MAX_NOTE_BYTES = int(float(os.environ.get("STUDYSYNC_MAX_NOTE_MB", "10")) * 1024 * 1024)
+MAX_UPLOAD_BYTES = int(float(os.environ.get("STUDYSYNC_MAX_UPLOAD_MB", "50")) * 1024 * 1024)
+# Whole MB for the uploader, which rejects bigger files in the browser
+MAX_NOTE_MB = max(1, math.ceil(MAX_NOTE_BYTES / (1024 * 1024)))
+
+
+def _save_uploads(username, branch, topic_id, uploaded_files, key):
+    # st.file_uploader hands back the same files on every rerun; only new ones are read.
+    seen_key = f"uploaded_ids_{key}"
+    seen = st.session_state.setdefault(seen_key, set())
+    pending = [f for f in uploaded_files if f.file_id not in seen]
+    if not pending:
+        return
+
+    total = sum(f.size for f in pending)
+    if total > MAX_UPLOAD_BYTES:
+        st.error(f"❌ These files add up to more than {MAX_UPLOAD_BYTES / (1024 * 1024):g} MB. Upload fewer at a time.")
+        return
+
+    blobs = get_blob_store()
+    index = get_notes_index()
+    known = {note["blob"] for note in index.notes(username, branch, topic_id)}
+    for uploaded_file in pending:
+        seen.add(uploaded_file.file_id)
+        if uploaded_file.size > MAX_NOTE_BYTES:
+            st.error(f"❌ '{uploaded_file.name}' is larger than {MAX_NOTE_BYTES / (1024 * 1024):g} MB.")
+            continue
+        try:
+            uploaded_file.seek(0)
+            blob_id, size, added = blobs.add_stream(uploaded_file, MAX_NOTE_BYTES, exclude=known)
+            if not added:
+                continue  # same bytes already attached to this topic
+            note = {"blob": blob_id, "name": uploaded_file.name, "size": size, "uploaded": int(time.time())}
+            known.add(blob_id)
+            if not index.add(username, branch, topic_id, note):
+                blobs.release(blob_id)  # attached meanwhile from another session
+                continue
+            get_thumbnail(blobs.path(blob_id))
+            st.success(f"✅ Notes '{uploaded_file.name}' uploaded successfully!")
+        except Exception as e:
+            st.error(f"❌ Error uploading file '{uploaded_file.name}': {e}")
+
+
+def _delete_note(username, branch, topic_id, blob_id):
+    if get_notes_index().remove(username, branch, topic_id, blob_id):
+        get_blob_store().release(blob_id)
+
+
+def _change_page(page_key, step):
+    st.session_state[page_key] = st.session_state.get(page_key, 0) + step
+
+
+# ✅ Upload form and paginated gallery for one topic
+def show_topic_notes(username, branch, topic, key):
+    uploaded_files = st.file_uploader(f"Upload notes for {topic.name}", type=["png", "jpg", "jpeg"], accept_multiple_files=True, max_upload_size=MAX_NOTE_MB, key=f"upload_{key}")
+
+    if uploaded_files:
+        _save_uploads(username, branch, topic.id, uploaded_files, key)
+    else:
+        st.info("Drag and drop your notes here or click 'Browse files'")
+
+    with span("notes_index"):
+        existing_notes = get_notes_index().notes(username, branch, topic.id)
+    if not existing_notes:
+        st.info("No notes uploaded yet for this topic.")
+        return
+
+    page_key = f"notes_page_{key}"
+    pages = (len(existing_notes) + NOTES_PER_PAGE - 1) // NOTES_PER_PAGE
+    page = min(max(st.session_state.get(page_key, 0), 0), pages - 1)
+    st.session_state[page_key] = page
+
+    blobs = get_blob_store()
+    st.markdown("---")
+    st.markdown("##### 📝 Your Existing Notes:")
+    for note in existing_notes[page * NOTES_PER_PAGE:(page + 1) * NOTES_PER_PAGE]:
+        full_note_path = blobs.path(note["blob"])
+        with span("note_image"):
+            if st.toggle("🔍 Full size", key=f"full_note_{key}_{note['blob']}"):
+                image_path = full_note_path
+                st.image(image_path, caption=f"Notes: {note['name']}", use_container_width=True)
+            else:
+                image_path = get_thumbnail(full_note_path)
+                st.image(image_path, caption=f"Notes: {note['name']}")
+        incr("images_sent")
+        incr("image_bytes_sent", os.path.getsize(image_path))
+        if st.button(f"Delete {note['name']}", key=f"delete_note_{key}_{note['blob']}"):
+            _delete_note(username, branch, topic.id, note["blob"])
+            st.rerun()
+
+    if pages > 1:
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            st.button("⬅️ Previous", key=f"notes_prev_{key}", disabled=page == 0, on_click=_change_page, args=(page_key, -1))
+        with col_page:
+            st.caption(f"Page {page + 1} of {pages} · {len(existing_notes)} notes")
+        with col_next:
+            st.button("Next ➡️", key=f"notes_next_{key}", disabled=page == pages - 1, on_click=_change_page, args=(page_key, 1))
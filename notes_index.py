@@ -0,0 +1,230 @@
+"""Per-user index of uploaded notes.
+
+``user_data/<user>/notes_index.json`` lists, for every topic with notes, the
+attached blobs plus a count, total size and last-change time::
+
+    {"format": 1, "topics": {"cse/12": {"count": 2, "bytes": 355523,
+                                         "updated": 1750669666,
+                                         "notes": [{"blob", "name", "size", "uploaded"}]}}}
+
+Topics are keyed ``<branch>/<topic id>``. Every change is a locked
+read-modify-write followed by an atomic replace, so concurrent sessions
+can't lose each other's updates. Pages read the index instead of walking
+``notes/<branch>/<Subject>/<Topic>/`` folders, which are only read once, to
+import notes saved by older versions. The import copies; the old files stay
+until ``python notes_index.py migrate --delete-originals`` removes them.
+"""
+import argparse
+import logging
+import os
+import time
+
+from blobstore import blob_id_of, get_blob_store
+from cache import LRUCache
+from fileio import atomic_write_json, file_lock, read_json
+from singleton import lazy_singleton
+from syllabus import branches, path_component
+from thumbnails import remove_thumbnail
+
+logger = logging.getLogger(__name__)
+
+USER_DATA_DIR = "user_data"
+INDEX_FORMAT = 1
+NOTE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+# Most users whose index is kept in memory
+NOTES_CACHE_SIZE = int(os.environ.get("STUDYSYNC_NOTES_CACHE", "1024"))
+
+
+def topic_key(branch, topic_id):
+    return f"{branch}/{topic_id}"
+
+
+def _summarize(entry):
+    entry["count"] = len(entry["notes"])
+    entry["bytes"] = sum(note["size"] for note in entry["notes"])
+    entry["updated"] = int(time.time())
+
+
+class NotesIndex:
+    def __init__(self, data_dir=USER_DATA_DIR, cache_size=NOTES_CACHE_SIZE):
+        self.data_dir = data_dir
+        self._cache = LRUCache("notes_index", cache_size)  # username -> (topics, mtime_ns)
+
+    def _path(self, username):
+        return os.path.join(self.data_dir, username, "notes_index.json")
+
+    def _lock_path(self, username):
+        return os.path.join(self.data_dir, username, ".notes_index.lock")
+
+    def topics(self, username):
+        """Return ``{"<branch>/<topic id>": entry}``; treat it as read-only."""
+        path = self._path(username)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            self._import_legacy(username)
+            mtime = os.stat(path).st_mtime_ns
+        cached = self._cache.get(username)
+        if cached is not None and cached[1] == mtime:
+            return cached[0]
+        topics = read_json(path, {}).get("topics", {})
+        self._cache.put(username, (topics, mtime))
+        return topics
+
+    def notes(self, username, branch, topic_id):
+        entry = self.topics(username).get(topic_key(branch, topic_id))
+        return entry["notes"] if entry else []
+
+    def counts(self, username, branch):
+        """Return ``{topic_id: note_count}`` for topics of ``branch`` with notes."""
+        prefix = f"{branch}/"
+        return {
+            int(key[len(prefix):]): entry["count"]
+            for key, entry in self.topics(username).items()
+            if key.startswith(prefix) and entry["count"]
+        }
+
+    def _update(self, username, change):
+        # Locked read-modify-write of the whole index; ``change`` edits topics in place.
+        path = self._path(username)
+        with file_lock(self._lock_path(username)):
+            topics = read_json(path, {}).get("topics", {})
+            result = change(topics)
+            atomic_write_json(path, {"format": INDEX_FORMAT, "topics": topics})
+            mtime = os.stat(path).st_mtime_ns
+        self._cache.put(username, (topics, mtime))
+        return result
+
+    def add(self, username, branch, topic_id, note):
+        """Attach ``note``; returns False if the topic already has that blob."""
+        def change(topics):
+            entry = topics.setdefault(topic_key(branch, topic_id), {"notes": []})
+            if any(existing["blob"] == note["blob"] for existing in entry["notes"]):
+                return False
+            entry["notes"].append(note)
+            _summarize(entry)
+            return True
+        return self._update(username, change)
+
+    def remove(self, username, branch, topic_id, blob_id):
+        """Detach ``blob_id``; returns False if it wasn't attached."""
+        def change(topics):
+            key = topic_key(branch, topic_id)
+            entry = topics.get(key)
+            if not entry or not any(note["blob"] == blob_id for note in entry["notes"]):
+                return False
+            entry["notes"] = [note for note in entry["notes"] if note["blob"] != blob_id]
+            if entry["notes"]:
+                _summarize(entry)
+            else:
+                del topics[key]
+            return True
+        return self._update(username, change)
+
+    def _legacy_folders(self, username):
+        # Yield (branch, topic, folder) for every topic's old notes/<branch>/<Subject>/<Topic>/ folder.
+        notes_root = os.path.join(self.data_dir, username, "notes")
+        for branch in branches():
+            for subject in branch.subjects:
+                for topic in subject.topics:
+                    yield branch, topic, os.path.join(notes_root, branch.code, path_component(subject.name), path_component(topic.name))
+
+    def _import_legacy(self, username):
+        # One-time copy of the old note folders into the blob store for users
+        # without an index. The originals stay; see remove_legacy_notes().
+        notes_root = os.path.join(self.data_dir, username, "notes")
+
+        def change(topics):
+            if topics or not os.path.isdir(notes_root):
+                return
+            blobs = get_blob_store()
+            for branch, topic, folder in self._legacy_folders(username):
+                notes = _import_folder(blobs, folder)
+                if notes:
+                    entry = {"notes": notes}
+                    _summarize(entry)
+                    topics[topic_key(branch.code, topic.id)] = entry
+
+        self._update(username, change)
+
+    def remove_legacy_notes(self, username):
+        """Delete old note files whose content is in the user's index; returns how many.
+
+        Files that weren't imported (unreadable, or added after the index was
+        built) are left in place, as are the folders holding them.
+        """
+        topics = self.topics(username)
+        removed = 0
+        for branch, topic, folder in self._legacy_folders(username):
+            if not os.path.isdir(folder):
+                continue
+            entry = topics.get(topic_key(branch.code, topic.id))
+            attached = {note["blob"] for note in entry["notes"]} if entry else set()
+            for name in sorted(os.listdir(folder)):
+                path = os.path.join(folder, name)
+                if name.lower().endswith(NOTE_EXTENSIONS) and os.path.isfile(path) and blob_id_of(path) in attached:
+                    os.remove(path)
+                    remove_thumbnail(path)
+                    removed += 1
+        _prune_empty_dirs(os.path.join(self.data_dir, username, "notes"))
+        return removed
+
+
+def _import_folder(blobs, folder):
+    if not os.path.isdir(folder):
+        return []
+    notes = []
+    known = set()
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        if not name.lower().endswith(NOTE_EXTENSIONS) or not os.path.isfile(path):
+            continue
+        try:
+            with open(path, "rb") as f:
+                blob_id, size, added = blobs.add_stream(f, exclude=known)
+        except ValueError:
+            logger.warning("Leaving unrecognised note file %s in place", path)
+            continue
+        if added:
+            notes.append({"blob": blob_id, "name": name, "size": size, "uploaded": int(os.path.getmtime(path))})
+            known.add(blob_id)
+    return notes
+
+
+def _prune_empty_dirs(root):
+    if not os.path.isdir(root):
+        return
+    for directory, _subdirs, _files in os.walk(root, topdown=False):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass  # not empty
+
+
+get_notes_index = lazy_singleton(NotesIndex)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="StudySync notes index tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="build every user's index from the old notes/ folders")
+    migrate.add_argument("--data-dir", default=USER_DATA_DIR)
+    migrate.add_argument("--delete-originals", action="store_true", help="then delete the old files that were imported")
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        index = NotesIndex(args.data_dir)
+        names = os.listdir(args.data_dir) if os.path.isdir(args.data_dir) else []
+        users = sorted(
+            name for name in names
+            if not name.startswith(".") and os.path.isdir(os.path.join(args.data_dir, name))
+        )
+        notes = sum(entry["count"] for username in users for entry in index.topics(username).values())
+        print(f"Indexed {notes} notes for {len(users)} users")
+        if args.delete_originals:
+            removed = sum(index.remove_legacy_notes(username) for username in users)
+            print(f"Deleted {removed} imported files from the old notes/ folders")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,645 @@
+"""Progress storage for the branch checklists.
+
+A user's progress in one branch is a bitset: bit ``n`` is set when the topic
+with syllabus id ``n`` is completed (see ``syllabus.py``). Every branch page
+reads and writes it through a ``ProgressStore``. Three backends are available,
+picked with the ``STUDYSYNC_PROGRESS_BACKEND`` environment variable:
+
+* ``json``   - one ``user_data/<user>/<branch>_progress.json`` file per branch
+* ``sqlite`` - a single WAL-mode database with one row per user and branch
+* ``events`` - a per-user append-only log of changes plus snapshots, which
+  keeps the full history and supports undo
+
+The json and sqlite backends also keep per-user summary counters (completed
+topics per branch and subject), updated with every write, so a cross-branch
+overview reads one small record instead of every branch's bitset; the events
+backend holds all of a user's branches in one cached state anyway.
+
+Existing JSON files can be imported into SQLite with::
+
+    python progress_store.py migrate
+"""
+import argparse
+import atexit
+import contextlib
+import glob
+import itertools
+import json
+import os
+import threading
+import time
+
+from cache import LRUCache
+from fileio import atomic_write_json, file_lock, read_json
+from metrics import incr
+from singleton import lazy_singleton
+from sqlite_db import SqliteDatabase
+from syllabus import bits_from_legacy, branches, get_branch
+
+USER_DATA_DIR = "user_data"
+SQLITE_PATH = os.path.join(USER_DATA_DIR, "progress.db")
+# Seconds to wait before writing buffered JSON changes to disk
+FLUSH_DELAY = float(os.environ.get("STUDYSYNC_FLUSH_DELAY", "1.0"))
+# Most (user, branch) bitsets and user summaries kept in memory
+PROGRESS_CACHE_SIZE = int(os.environ.get("STUDYSYNC_PROGRESS_CACHE", "4096"))
+# Events appended to a user's log before it is folded into a new snapshot
+COMPACT_EVERY = int(os.environ.get("STUDYSYNC_COMPACT_EVERY", "200"))
+# Moved-aside log segments that history() and undo() read, newest first
+HISTORY_SEGMENTS = int(os.environ.get("STUDYSYNC_HISTORY_SEGMENTS", "2"))
+# Moved-aside log segments kept per user; older ones are deleted on compaction
+KEEP_SEGMENTS = int(os.environ.get("STUDYSYNC_KEEP_SEGMENTS", "10"))
+# Version tag of the bitset layout in <branch>_progress.json
+JSON_FORMAT = 2
+SUMMARY_FORMAT = 1
+
+
+def bits_to_blob(bits):
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+
+def bits_from_blob(blob):
+    return int.from_bytes(blob or b"", "little")
+
+
+def apply_topic(bits, topic_id, done):
+    return bits | (1 << topic_id) if done else bits & ~(1 << topic_id)
+
+
+def read_progress_file(branch, path):
+    """Return ``(bits, version)`` of a ``<branch>_progress.json`` file in either layout."""
+    raw = read_json(path, {})
+    if raw.get("format") == JSON_FORMAT:
+        return int(raw.get("bits") or "0", 16), raw.get("version", 0)
+    return bits_from_legacy(get_branch(branch), raw), 0
+
+
+def count_subjects(branch, bits):
+    return {subject.name: subject.completed(bits) for subject in get_branch(branch).subjects}
+
+
+class ProgressStore:
+    """Interface shared by all progress backends."""
+
+    def load_versioned(self, username, branch):
+        """Return ``(bits, version)``; the version goes up with every write."""
+        raise NotImplementedError
+
+    def load_bits(self, username, branch):
+        """Return the completed-topics bitset for one user and branch."""
+        return self.load_versioned(username, branch)[0]
+
+    def set_topic(self, username, branch, topic_id, done):
+        """Mark one topic, merged with whatever else changed concurrently.
+
+        Returns False when the topic already had that state, e.g. because
+        another tab changed it first.
+        """
+        raise NotImplementedError
+
+    def set_bits(self, username, branch, bits):
+        """Replace the whole bitset, e.g. when importing."""
+        raise NotImplementedError
+
+    def flush(self):
+        """Write out any buffered changes."""
+
+    def is_done(self, username, branch, topic_id):
+        return bool(self.load_bits(username, branch) >> topic_id & 1)
+
+    def subject_counts(self, username, branch):
+        """Return ``{subject: completed_topics}`` for one user and branch."""
+        return count_subjects(branch, self.load_bits(username, branch))
+
+    def summary(self, username):
+        """Return ``{branch_code: {subject: completed_topics}}`` for every branch."""
+        return {branch.code: self.subject_counts(username, branch.code) for branch in branches()}
+
+    def iter_bits(self, branch):
+        """Yield ``(username, bits)`` for every user with saved progress in ``branch``."""
+        raise NotImplementedError
+
+
+class JsonProgressStore(ProgressStore):
+    """One ``<branch>_progress.json`` file per user and branch.
+
+    Files hold ``{"format": 2, "version": n, "bits": "<hex>"}``; files still
+    in the old ``{"<subject>_<topic>_<branch>": bool}`` layout are read
+    through the syllabus and rewritten in the new layout on their next change.
+
+    Files are cached in memory (LRU, ``cache_size`` entries) after the first
+    read and re-read only when their mtime changes. Changes are kept as
+    per-topic set/clear masks and written back by a single debounced flush
+    ``flush_delay`` seconds later, so a burst of checkbox toggles costs one
+    write and a rerun without changes costs none.
+
+    A flush merges the masks into what is on disk *at that moment*, under a
+    lock file per user and branch, and bumps the version. Two tabs or worker
+    processes editing the same branch therefore only overwrite each other on
+    the topics both of them changed, and different users never wait on each
+    other.
+
+    Each flush also rewrites the flushed branch's entry in the user's
+    ``progress_summary.json`` while still holding the branch lock, so the
+    summary always matches the bitsets on disk. ``summary()`` reads that one
+    file and recounts only branches with changes still buffered in memory.
+    """
+
+    def __init__(self, data_dir=USER_DATA_DIR, flush_delay=FLUSH_DELAY, cache_size=PROGRESS_CACHE_SIZE):
+        self.data_dir = data_dir
+        self.flush_delay = flush_delay
+        self._lock = threading.RLock()
+        self._cache = LRUCache("progress", cache_size)  # (username, branch) -> (bits, version, mtime_ns)
+        self._pending = {}  # (username, branch) -> (set_mask, clear_mask) not yet on disk
+        self._summaries = LRUCache("summary", cache_size)  # username -> ({branch: {subject: completed}}, mtime_ns)
+        self._timer = None
+        atexit.register(self.flush)
+
+    def _path(self, username, branch):
+        return os.path.join(self.data_dir, username, f"{branch}_progress.json")
+
+    def _lock_path(self, username, branch):
+        return os.path.join(self.data_dir, username, f".{branch}_progress.lock")
+
+    def _summary_path(self, username):
+        return os.path.join(self.data_dir, username, "progress_summary.json")
+
+    def _summary_lock_path(self, username):
+        return os.path.join(self.data_dir, username, ".progress_summary.lock")
+
+    def _read_file(self, branch, path):
+        return read_progress_file(branch, path)
+
+    def _load(self, username, branch):
+        # Return the cached (bits, version, mtime_ns), re-reading the file if it changed.
+        key = (username, branch)
+        path = self._path(username, branch)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and key in self._pending:
+                return cached
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            if cached is not None and cached[2] == mtime:
+                return cached
+            bits, version = self._read_file(branch, path)
+            if key in self._pending:  # evicted while changes were still buffered
+                set_mask, clear_mask = self._pending[key]
+                bits = (bits | set_mask) & ~clear_mask
+            self._cache.put(key, (bits, version, mtime))
+            return bits, version, mtime
+
+    def load_versioned(self, username, branch):
+        bits, version, _mtime = self._load(username, branch)
+        return bits, version
+
+    def load_bits(self, username, branch):
+        return self.load_versioned(username, branch)[0]
+
+    def set_topic(self, username, branch, topic_id, done):
+        bit = 1 << topic_id
+        if done:
+            return self._change(username, branch, bit, 0)
+        return self._change(username, branch, 0, bit)
+
+    def set_bits(self, username, branch, bits):
+        self._change(username, branch, bits, get_branch(branch).mask & ~bits)
+
+    def _change(self, username, branch, set_mask, clear_mask):
+        key = (username, branch)
+        with self._lock:
+            bits, version, mtime = self._load(username, branch)
+            updated = (bits | set_mask) & ~clear_mask
+            if updated == bits and key not in self._pending:
+                return False
+            pending_set, pending_clear = self._pending.get(key, (0, 0))
+            self._pending[key] = (
+                (pending_set & ~clear_mask) | set_mask,
+                (pending_clear & ~set_mask) | clear_mask,
+            )
+            self._cache.put(key, (updated, version, mtime))
+            self._schedule_flush()
+            return updated != bits
+
+    def _schedule_flush(self):
+        if self.flush_delay <= 0:
+            self.flush()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            for key in sorted(self._pending):
+                set_mask, clear_mask = self._pending[key]
+                path = self._path(*key)
+                with file_lock(self._lock_path(*key)):
+                    bits, version = self._read_file(key[1], path)
+                    merged = (bits | set_mask) & ~clear_mask
+                    atomic_write_json(path, {"format": JSON_FORMAT, "version": version + 1, "bits": format(merged, "x")})
+                    mtime = os.stat(path).st_mtime_ns
+                    self._update_summary(key[0], {key[1]: count_subjects(key[1], merged)})
+                self._cache.put(key, (merged, version + 1, mtime))
+                del self._pending[key]
+
+    def iter_bits(self, branch):
+        # Reads the files on disk, without taking locks; meant for batch jobs.
+        if not os.path.isdir(self.data_dir):
+            return
+        for entry in sorted(os.scandir(self.data_dir), key=lambda entry: entry.name):
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            path = self._path(entry.name, branch)
+            if os.path.exists(path):
+                yield entry.name, self._read_file(branch, path)[0]
+
+    def _update_summary(self, username, counts):
+        # Locked read-modify-write of the summary; a missing one is rebuilt from every branch file.
+        path = self._summary_path(username)
+        with file_lock(self._summary_lock_path(username)):
+            raw = read_json(path)
+            if raw is None:
+                summary = {
+                    branch.code: count_subjects(branch.code, self._read_file(branch.code, self._path(username, branch.code))[0])
+                    for branch in branches()
+                }
+            else:
+                summary = raw.get("branches", {})
+            summary.update(counts)
+            atomic_write_json(path, {"format": SUMMARY_FORMAT, "branches": summary})
+            mtime = os.stat(path).st_mtime_ns
+        self._summaries.put(username, (summary, mtime))
+        return summary, mtime
+
+    def summary(self, username):
+        path = self._summary_path(username)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        cached = self._summaries.get(username)
+        if cached is not None and cached[1] == mtime:
+            summary = cached[0]
+        elif mtime is None:
+            summary, _mtime = self._update_summary(username, {})
+        else:
+            summary = read_json(path, {}).get("branches", {})
+            self._summaries.put(username, (summary, mtime))
+        summary = dict(summary)
+        with self._lock:
+            for user, branch in self._pending:
+                if user == username:
+                    summary[branch] = count_subjects(branch, self._load(user, branch)[0])
+        return summary
+
+
+class SqliteProgressStore(ProgressStore, SqliteDatabase):
+    """One bitset row per user and branch in a WAL-mode SQLite database.
+
+    Every topic change is a read-modify-write of its row inside one
+    ``BEGIN IMMEDIATE`` transaction, so concurrent sessions merge per topic
+    and each write bumps the row's version. The same transaction adjusts the
+    ``progress_summary`` counter of the topic's subject by one.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS progress_bits (
+            username TEXT NOT NULL,
+            branch   TEXT NOT NULL,
+            bits     BLOB NOT NULL,
+            version  INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (username, branch)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS progress_summary (
+            username  TEXT NOT NULL,
+            branch    TEXT NOT NULL,
+            subject   TEXT NOT NULL,
+            completed INTEGER NOT NULL,
+            PRIMARY KEY (username, branch, subject)
+        ) WITHOUT ROWID;
+    """
+
+    AUTOCOMMIT = True
+    PRAGMAS = ("synchronous=NORMAL",)
+
+    def __init__(self, path=SQLITE_PATH):
+        super().__init__(path)
+
+    def _write_summary(self, conn, username, branch, bits):
+        conn.executemany(
+            "INSERT INTO progress_summary (username, branch, subject, completed) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (username, branch, subject) DO UPDATE SET completed = excluded.completed",
+            [(username, branch, subject, completed) for subject, completed in count_subjects(branch, bits).items()],
+        )
+
+    def _read(self, conn, username, branch):
+        row = conn.execute(
+            "SELECT bits, version FROM progress_bits WHERE username = ? AND branch = ?",
+            (username, branch),
+        ).fetchone()
+        return (bits_from_blob(row[0]), row[1]) if row else (0, 0)
+
+    def _write(self, conn, username, branch, bits):
+        conn.execute(
+            "INSERT INTO progress_bits (username, branch, bits, version) VALUES (?, ?, ?, 1) "
+            "ON CONFLICT (username, branch) DO UPDATE SET bits = excluded.bits, version = version + 1",
+            (username, branch, bits_to_blob(bits)),
+        )
+
+    def load_versioned(self, username, branch):
+        return self._read(self._conn(), username, branch)
+
+    def set_topic(self, username, branch, topic_id, done):
+        with self._transaction() as conn:
+            bits, _version = self._read(conn, username, branch)
+            updated = apply_topic(bits, topic_id, done)
+            if updated != bits:
+                self._write(conn, username, branch, updated)
+                conn.execute(
+                    "INSERT INTO progress_summary (username, branch, subject, completed) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (username, branch, subject) DO UPDATE SET completed = completed + excluded.completed",
+                    (username, branch, get_branch(branch).topic(topic_id).subject, 1 if done else -1),
+                )
+            return updated != bits
+
+    def set_bits(self, username, branch, bits):
+        with self._transaction() as conn:
+            self._write(conn, username, branch, bits)
+            self._write_summary(conn, username, branch, bits)
+
+    def iter_bits(self, branch):
+        rows = self._conn().execute(
+            "SELECT username, bits FROM progress_bits WHERE branch = ? ORDER BY username", (branch,)
+        )
+        for username, blob in rows:
+            yield username, bits_from_blob(blob)
+
+    def summary(self, username):
+        summary = {branch.code: {} for branch in branches()}
+        rows = self._conn().execute(
+            "SELECT branch, subject, completed FROM progress_summary WHERE username = ?", (username,)
+        )
+        for branch, subject, completed in rows:
+            summary.setdefault(branch, {})[subject] = completed
+        return summary
+
+
+class EventLogProgressStore(ProgressStore):
+    """A per-user append-only log of progress changes, plus snapshots.
+
+    Every effective change is appended to ``user_data/<user>/progress_events.log``
+    as one JSON line, numbered by a per-user sequence::
+
+        {"seq": 42, "ts": 1750669666, "b": "cse", "t": 12, "d": 1}
+        {"seq": 43, "ts": 1750669670, "b": "cse", "bits": "ff", "prev": "7"}
+        {"seq": 44, "ts": 1750669700, "b": "cse", "t": 12, "d": 0, "undo": 42}
+
+    After ``compact_every`` events the state is written to
+    ``progress_snapshot.json`` and the log is moved aside as
+    ``progress_events.log.<last seq>``, so loading reads one snapshot and a
+    short tail. The newest ``keep_segments`` moved segments are kept; older
+    ones are deleted. ``history()`` and ``undo()`` read the live log and at
+    most ``history_segments`` of them, so a branch with few changes doesn't
+    cost a read of every segment. ``undo()`` appends the inverse of the
+    latest change not yet undone.
+
+    A user's state is cached in memory and brought up to date by reading only
+    the bytes appended since the last look. Appends and compaction hold a
+    per-user lock file; events are applied by sequence number, so replaying
+    one twice after a concurrent compaction is harmless. Users without a log
+    start from their ``<branch>_progress.json`` files.
+    """
+
+    def __init__(self, data_dir=USER_DATA_DIR, compact_every=COMPACT_EVERY, cache_size=PROGRESS_CACHE_SIZE,
+                 history_segments=HISTORY_SEGMENTS, keep_segments=KEEP_SEGMENTS):
+        self.data_dir = data_dir
+        self.compact_every = compact_every
+        self.history_segments = history_segments
+        self.keep_segments = keep_segments
+        self._lock = threading.RLock()
+        self._states = LRUCache("events", cache_size)  # username -> state dict, see _fresh_state
+
+    def _log_path(self, username):
+        return os.path.join(self.data_dir, username, "progress_events.log")
+
+    def _segments_newest_first(self, username):
+        # Names end in the zero-padded last seq, so they sort by age.
+        return sorted(glob.glob(glob.escape(self._log_path(username)) + ".*"), reverse=True)
+
+    def _snapshot_path(self, username):
+        return os.path.join(self.data_dir, username, "progress_snapshot.json")
+
+    def _lock_path(self, username):
+        return os.path.join(self.data_dir, username, ".progress_events.lock")
+
+    def _fresh_state(self, username):
+        raw = read_json(self._snapshot_path(username))
+        if raw is not None:
+            bits = {branch: int(value, 16) for branch, value in raw.get("branches", {}).items()}
+            seq = raw.get("seq", 0)
+        else:
+            bits = {branch.code: read_progress_file(branch.code, os.path.join(self.data_dir, username, f"{branch.code}_progress.json"))[0]
+                    for branch in branches()}
+            seq = 0
+        return {"bits": bits, "seq": seq, "since_snapshot": 0, "inode": None, "offset": 0}
+
+    def _state(self, username):
+        # Cached state, updated with whatever was appended to the log since.
+        with self._lock:
+            try:
+                log = open(self._log_path(username), "rb")
+            except FileNotFoundError:
+                log = None
+            with log or contextlib.nullcontext():
+                inode = os.fstat(log.fileno()).st_ino if log else None
+                state = self._states.get(username)
+                if state is None or state["inode"] != inode:
+                    state = self._fresh_state(username)
+                    state["inode"] = inode
+                    self._states.put(username, state)
+                if log:
+                    log.seek(state["offset"])
+                    tail = log.read()
+                    end = tail.rfind(b"\n") + 1  # ignore a line still being written
+                    for line in tail[:end].splitlines():
+                        self._apply(state, json.loads(line))
+                    state["offset"] += end
+                    incr("bytes_read", end)
+            return state
+
+    @staticmethod
+    def _apply(state, event):
+        if event["seq"] <= state["seq"]:
+            return
+        branch = event["b"]
+        if "bits" in event:
+            state["bits"][branch] = int(event["bits"], 16)
+        else:
+            state["bits"][branch] = apply_topic(state["bits"].get(branch, 0), event["t"], event["d"])
+        state["seq"] = event["seq"]
+        state["since_snapshot"] += 1
+
+    def load_versioned(self, username, branch):
+        state = self._state(username)
+        return state["bits"].get(branch, 0), state["seq"]
+
+    def set_topic(self, username, branch, topic_id, done):
+        return self._append(username, {"b": branch, "t": topic_id, "d": int(done)}) is not None
+
+    def set_bits(self, username, branch, bits):
+        self._append(username, {"b": branch, "bits": format(bits, "x")})
+
+    def summary(self, username):
+        bits = self._state(username)["bits"]
+        return {branch.code: count_subjects(branch.code, bits.get(branch.code, 0)) for branch in branches()}
+
+    def _append(self, username, change):
+        with self._lock, file_lock(self._lock_path(username)):
+            return self._append_locked(username, change)
+
+    def _append_locked(self, username, change):
+        # Caller holds the user's lock file; returns the event, or None for a no-op.
+        state = self._state(username)
+        bits = state["bits"].get(change["b"], 0)
+        if "bits" in change:
+            updated = int(change["bits"], 16)
+            change["prev"] = format(bits, "x")
+        else:
+            updated = apply_topic(bits, change["t"], change["d"])
+        if updated == bits:
+            return None
+        event = {"seq": state["seq"] + 1, "ts": int(time.time()), **change}
+        line = (json.dumps(event, separators=(",", ":")) + "\n").encode("utf-8")
+        with open(self._log_path(username), "ab") as log:
+            log.write(line)
+            inode = os.fstat(log.fileno()).st_ino
+        incr("bytes_written", len(line))
+        if state["inode"] != inode:  # this append created the log
+            state["inode"], state["offset"] = inode, 0
+        self._apply(state, event)
+        state["offset"] += len(line)
+        if state["since_snapshot"] >= self.compact_every:
+            self._compact(username, state)
+        return event
+
+    def _compact(self, username, state):
+        # Caller holds the user's lock file.
+        snapshot = {"format": 1, "seq": state["seq"], "branches": {branch: format(bits, "x") for branch, bits in state["bits"].items()}}
+        atomic_write_json(self._snapshot_path(username), snapshot)
+        log_path = self._log_path(username)
+        os.replace(log_path, f"{log_path}.{state['seq']:010d}")
+        state.update(since_snapshot=0, inode=None, offset=0)
+        for path in self._segments_newest_first(username)[self.keep_segments:]:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+    def _events_newest_first(self, username, branch=None):
+        segments = self._segments_newest_first(username)[:self.history_segments]
+        for path in [self._log_path(username)] + segments:
+            try:
+                with open(path, "rb") as f:
+                    lines = [line for line in f if line.endswith(b"\n")]
+            except FileNotFoundError:
+                continue  # moved by a concurrent compaction
+            for line in reversed(lines):
+                event = json.loads(line)
+                if branch is None or event["b"] == branch:
+                    yield event
+
+    def history(self, username, branch=None, limit=None):
+        """Return the user's events, newest first, optionally for one branch.
+
+        Segments are read newest first and only until ``limit`` events are
+        found; changes older than the last ``history_segments`` aren't listed.
+        """
+        return list(itertools.islice(self._events_newest_first(username, branch), limit))
+
+    def undo(self, username, branch=None):
+        """Revert the latest change (in ``branch``) that hasn't been undone; return the new event.
+
+        Only changes within the last ``history_segments`` can be undone.
+        """
+        with self._lock, file_lock(self._lock_path(username)):
+            undone = set()
+            for event in self._events_newest_first(username, branch):
+                if "undo" in event:
+                    undone.add(event["undo"])
+                    continue
+                if event["seq"] in undone:
+                    continue
+                if "bits" in event:
+                    change = {"b": event["b"], "bits": event["prev"]}
+                else:
+                    change = {"b": event["b"], "t": event["t"], "d": 1 - event["d"]}
+                change["undo"] = event["seq"]
+                return self._append_locked(username, change)
+        return None
+
+    def iter_bits(self, branch):
+        if not os.path.isdir(self.data_dir):
+            return
+        for entry in sorted(os.scandir(self.data_dir), key=lambda entry: entry.name):
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            bits = self._state(entry.name)["bits"].get(branch, 0)
+            if bits:
+                yield entry.name, bits
+
+
+# ✅ One-shot import of the JSON files into another store
+def migrate_json(target, data_dir=USER_DATA_DIR):
+    source = JsonProgressStore(data_dir)
+    imported = 0
+    if not os.path.isdir(data_dir):
+        return imported
+    for username in sorted(os.listdir(data_dir)):
+        if username.startswith(".") or not os.path.isdir(os.path.join(data_dir, username)):
+            continue
+        for branch in branches():
+            bits = source.load_bits(username, branch.code)
+            if bits:
+                target.set_bits(username, branch.code, bits)
+                imported += bits.bit_count()
+    return imported
+
+
+def _open_store():
+    backend = os.environ.get("STUDYSYNC_PROGRESS_BACKEND", "json").lower()
+    if backend == "sqlite":
+        path = os.environ.get("STUDYSYNC_PROGRESS_DB", SQLITE_PATH)
+        is_new = not os.path.exists(path)
+        store = SqliteProgressStore(path)
+        if is_new:
+            migrate_json(store)
+        return store
+    if backend == "json":
+        return JsonProgressStore()
+    if backend == "events":
+        return EventLogProgressStore()
+    raise ValueError(f"Unknown progress backend: {backend}")
+
+
+# Return the process-wide store selected by STUDYSYNC_PROGRESS_BACKEND
+get_store = lazy_singleton(_open_store)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="StudySync progress store tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="import <branch>_progress.json files into SQLite")
+    migrate.add_argument("--data-dir", default=USER_DATA_DIR)
+    migrate.add_argument("--db", default=SQLITE_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        count = migrate_json(SqliteProgressStore(args.db), args.data_dir)
+        print(f"Imported {count} completed topics into {args.db}")
+
+
+if __name__ == "__main__":
+    main()
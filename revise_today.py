@@ -0,0 +1,42 @@
+import streamlit as st
+import navigation
+from revision import RATINGS, get_scheduler
+from syllabus import get_branch
+
+REVISE_LIMIT = 10
+
+
+def _review(username, code, topic_id, quality):
+    get_scheduler().review(username, code, topic_id, quality)
+
+
+# ✅ Topics due for revision today, with SM-2 rating buttons
+def show_revise_today(username):
+    scheduler = get_scheduler()
+    scheduler.backfill(username)
+    due = scheduler.due(username, limit=REVISE_LIMIT)
+
+    st.markdown("#### 🔁 Revise Today")
+    if not due:
+        st.caption("Nothing due for revision. Completed topics come back here on their review day.")
+        return
+
+    total = scheduler.due_count(username)
+    if total > len(due):
+        st.caption(f"Showing the {len(due)} most overdue of {total} topics.")
+    for code, topic_id, _due in due:
+        branch = get_branch(code)
+        topic = branch.topic(topic_id)
+        if topic is None:
+            continue
+        col_topic, *col_ratings = st.columns([4, 1, 1, 1, 1])
+        with col_topic:
+            st.button(
+                f"{topic.name} · {topic.subject} ({branch.name})",
+                key=f"revise_open_{code}_{topic_id}",
+                on_click=navigation.go_to,
+                kwargs={"branch": branch.name, "subject": topic.subject},
+            )
+        for column, (label, quality) in zip(col_ratings, RATINGS.items()):
+            with column:
+                st.button(label, key=f"revise_{label}_{code}_{topic_id}", on_click=_review, args=(username, code, topic_id, quality))
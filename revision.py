@@ -0,0 +1,188 @@
+"""Spaced-repetition revision schedule for completed topics.
+
+Ticking a topic creates a revision card for it; unticking removes it. Each
+card carries an SM-2 interval and ease factor, and every review (rated
+Again / Hard / Good / Easy) moves its due time out or back in.
+
+Cards live in ``user_data/revision.db`` (SQLite, WAL mode). The indexes on
+``(username, due)`` and ``(due)`` are the due-queues: "Revise today" for a
+user and the all-users batch job are range scans over them, and each review
+is a single-row update, both O(log n) however many topics are scheduled.
+
+Topics completed before scheduling existed are given cards on the user's
+first visit (or with ``python revision.py backfill``), spread over the next
+week so they don't all fall due on one day.
+"""
+import argparse
+import os
+import random
+import time
+
+from progress_store import get_store
+from singleton import lazy_singleton
+from sqlite_db import SqliteDatabase
+from syllabus import branches
+
+USER_DATA_DIR = "user_data"
+REVISION_DB = os.path.join(USER_DATA_DIR, "revision.db")
+DAY = 24 * 3600
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+BACKFILL_SPREAD_DAYS = 7
+# Review ratings on SM-2's 0-5 quality scale
+RATINGS = {"Again": 1, "Hard": 3, "Good": 4, "Easy": 5}
+
+
+def next_interval(interval, ease, reps, quality):
+    """Apply one SM-2 review; return ``(interval_days, ease, reps)``."""
+    if quality < 3:
+        reps, interval = 0, 1
+    else:
+        reps += 1
+        interval = 1 if reps == 1 else 6 if reps == 2 else max(round(interval * ease), 1)
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return interval, ease, reps
+
+
+class RevisionScheduler(SqliteDatabase):
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cards (
+            username TEXT NOT NULL,
+            branch   TEXT NOT NULL,
+            topic_id INTEGER NOT NULL,
+            due      INTEGER NOT NULL,
+            interval INTEGER NOT NULL,
+            ease     REAL NOT NULL,
+            reps     INTEGER NOT NULL,
+            PRIMARY KEY (username, branch, topic_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS cards_user_due ON cards (username, due);
+        CREATE INDEX IF NOT EXISTS cards_due ON cards (due);
+        CREATE TABLE IF NOT EXISTS backfilled (
+            username TEXT PRIMARY KEY
+        ) WITHOUT ROWID;
+    """
+
+    def topic_completed(self, username, branch, topic_id, now=None):
+        """Schedule the first revision of a newly ticked topic one day out."""
+        now = int(now or time.time())
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO cards (username, branch, topic_id, due, interval, ease, reps) "
+                "VALUES (?, ?, ?, ?, 1, ?, 1) ON CONFLICT DO NOTHING",
+                (username, branch, topic_id, now + DAY, INITIAL_EASE),
+            )
+
+    def topic_cleared(self, username, branch, topic_id):
+        with self._conn() as conn:
+            conn.execute(
+                "DELETE FROM cards WHERE username = ? AND branch = ? AND topic_id = ?",
+                (username, branch, topic_id),
+            )
+
+    def review(self, username, branch, topic_id, quality, now=None):
+        """Record a review rated ``quality`` (0-5); returns the next due time, or None."""
+        now = int(now or time.time())
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT interval, ease, reps FROM cards WHERE username = ? AND branch = ? AND topic_id = ?",
+                (username, branch, topic_id),
+            ).fetchone()
+            if row is None:
+                return None
+            interval, ease, reps = next_interval(*row, quality)
+            conn.execute(
+                "UPDATE cards SET due = ?, interval = ?, ease = ?, reps = ? "
+                "WHERE username = ? AND branch = ? AND topic_id = ?",
+                (now + interval * DAY, interval, ease, reps, username, branch, topic_id),
+            )
+        return now + interval * DAY
+
+    def cards(self, username):
+        """Return all of a user's cards as ``[[branch, topic_id, due, interval, ease, reps]]``."""
+        rows = self._conn().execute(
+            "SELECT branch, topic_id, due, interval, ease, reps FROM cards WHERE username = ? ORDER BY branch, topic_id",
+            (username,),
+        )
+        return [list(row) for row in rows]
+
+    def restore_cards(self, username, cards):
+        """Insert exported cards, keeping any the user already has."""
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT INTO cards VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT DO NOTHING",
+                [(username, *card) for card in cards],
+            )
+
+    def due(self, username, now=None, limit=None):
+        """Return ``[(branch, topic_id, due)]`` due by ``now``, most overdue first."""
+        now = int(now or time.time())
+        return self._conn().execute(
+            "SELECT branch, topic_id, due FROM cards WHERE username = ? AND due <= ? ORDER BY due LIMIT ?",
+            (username, now, -1 if limit is None else limit),
+        ).fetchall()
+
+    def due_count(self, username, now=None):
+        now = int(now or time.time())
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM cards WHERE username = ? AND due <= ?", (username, now)
+        ).fetchone()[0]
+
+    def due_by_user(self, now=None):
+        """Return ``{username: cards_due}`` across all users, from the due index."""
+        now = int(now or time.time())
+        rows = self._conn().execute(
+            "SELECT username, COUNT(*) FROM cards WHERE due <= ? GROUP BY username", (now,)
+        )
+        return dict(rows)
+
+    def backfill(self, username, store=None, now=None):
+        """Create cards for topics ticked before scheduling existed, once per user."""
+        conn = self._conn()
+        if conn.execute("SELECT 1 FROM backfilled WHERE username = ?", (username,)).fetchone():
+            return 0
+        store = store or get_store()
+        now = int(now or time.time())
+        rng = random.Random(username)
+        rows = []
+        for branch in branches():
+            bits = store.load_bits(username, branch.code)
+            for topic in branch.topics.values():
+                if bits & topic.bit:
+                    due = now + rng.randrange(1, BACKFILL_SPREAD_DAYS + 1) * DAY
+                    rows.append((username, branch.code, topic.id, due, 1, INITIAL_EASE, 1))
+        with conn:
+            conn.executemany("INSERT INTO cards VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT DO NOTHING", rows)
+            conn.execute("INSERT INTO backfilled (username) VALUES (?) ON CONFLICT DO NOTHING", (username,))
+        return len(rows)
+
+
+get_scheduler = lazy_singleton(lambda: RevisionScheduler(os.environ.get("STUDYSYNC_REVISION_DB", REVISION_DB)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="StudySync revision schedule tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("due", help="print how many revisions each user has due")
+    backfill = sub.add_parser("backfill", help="schedule already-completed topics for every user")
+    backfill.add_argument("--data-dir", default=USER_DATA_DIR)
+    args = parser.parse_args(argv)
+
+    scheduler = get_scheduler()
+    if args.command == "due":
+        counts = scheduler.due_by_user()
+        for username, count in sorted(counts.items(), key=lambda item: -item[1]):
+            print(f"{username}\t{count}")
+        print(f"{sum(counts.values())} revisions due for {len(counts)} users")
+    elif args.command == "backfill":
+        store = get_store()
+        users = sorted(
+            name for name in os.listdir(args.data_dir)
+            if not name.startswith(".") and os.path.isdir(os.path.join(args.data_dir, name))
+        )
+        created = sum(scheduler.backfill(username, store) for username in users)
+        print(f"Scheduled {created} topics for {len(users)} users")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import streamlit as st
+import navigation
+from metrics import span
+from topic_search import get_topic_index
+
+SEARCH_KEY = "topic_search"
+
+
+def _open_result(branch, subject):
+    st.session_state[SEARCH_KEY] = ""
+    navigation.go_to(branch=branch, subject=subject)
+
+
+# ✅ Jump straight to a topic from the home page
+def show_search_box():
+    query = st.text_input("🔎 Search topics", key=SEARCH_KEY, placeholder="e.g. Pipelining, Laplace Transform")
+    if not query.strip():
+        return
+    with span("topic_search"):
+        results = get_topic_index().search(query)
+    if not results:
+        st.caption("No matching topics")
+        return
+    for i, (branch, subject, topic) in enumerate(results):
+        label = f"{topic.name} · {subject.name}" if topic else f"📚 {subject.name}"
+        st.button(
+            f"{label} · {branch.name}",
+            key=f"search_result_{i}",
+            on_click=_open_result,
+            kwargs={"branch": branch.name, "subject": subject.name},
+        )
@@ -0,0 +1,67 @@
+"""Login sessions that survive a page reload.
+
+After login the browser gets a ``studysync_session`` cookie holding a random
+token. The URL never carries it, so a copied link opens the same page but
+doesn't log anyone in. Tokens are kept in ``user_data/sessions.db`` as
+SHA-256 hashes with their user and expiry time; logging out deletes the row,
+so the token stops working at once even if the cookie survives somewhere.
+"""
+import hashlib
+import os
+import secrets
+import time
+
+from singleton import lazy_singleton
+from sqlite_db import SqliteDatabase
+
+USER_DATA_DIR = "user_data"
+SESSIONS_DB = os.path.join(USER_DATA_DIR, "sessions.db")
+SESSION_COOKIE = "studysync_session"
+SESSION_TTL = int(float(os.environ.get("STUDYSYNC_SESSION_HOURS", "168")) * 3600)
+
+
+def _digest(token):
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class SessionStore(SqliteDatabase):
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            token_hash TEXT PRIMARY KEY,
+            username   TEXT NOT NULL,
+            expires    INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires);
+    """
+
+    def issue(self, username, ttl=SESSION_TTL):
+        """Start a session for ``username``; returns the token for the cookie."""
+        token = secrets.token_urlsafe(32)
+        now = int(time.time())
+        with self._conn() as conn:
+            conn.execute("DELETE FROM sessions WHERE expires < ?", (now,))
+            conn.execute(
+                "INSERT INTO sessions (token_hash, username, expires) VALUES (?, ?, ?)",
+                (_digest(token), username, now + ttl),
+            )
+        return token
+
+    def verify(self, token):
+        """Return the username of a live, unexpired session, else None."""
+        # No cookie is None; under AppTest st.context hands back a mock
+        if not isinstance(token, str) or not token:
+            return None
+        row = self._conn().execute(
+            "SELECT username FROM sessions WHERE token_hash = ? AND expires >= ?",
+            (_digest(token), int(time.time())),
+        ).fetchone()
+        return row[0] if row else None
+
+    def revoke(self, token):
+        if not isinstance(token, str) or not token:
+            return
+        with self._conn() as conn:
+            conn.execute("DELETE FROM sessions WHERE token_hash = ?", (_digest(token),))
+
+
+get_session_store = lazy_singleton(lambda: SessionStore(os.environ.get("STUDYSYNC_SESSIONS_DB", SESSIONS_DB)))
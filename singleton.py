@@ -0,0 +1,23 @@
+"""Process-wide instances created on first use.
+
+Every store and index is shared by all sessions of a process and built the
+first time a page asks for it::
+
+    get_scheduler = lazy_singleton(lambda: RevisionScheduler(path))
+"""
+import threading
+
+
+def lazy_singleton(factory):
+    """Return a function that calls ``factory()`` once, under a lock, and then returns its result."""
+    instance = None
+    lock = threading.Lock()
+
+    def get():
+        nonlocal instance
+        with lock:
+            if instance is None:
+                instance = factory()
+            return instance
+
+    return get
@@ -0,0 +1,48 @@
+"""Base class of the SQLite-backed stores.
+
+Connections are kept per thread, since Streamlit runs every session on its
+own script thread, and opened in WAL mode so readers never wait for a
+writer. Subclasses set ``SCHEMA`` (created if missing), and ``AUTOCOMMIT``
+to group statements explicitly with ``_transaction()`` instead of relying on
+``sqlite3``'s implicit transactions.
+"""
+import contextlib
+import os
+import sqlite3
+import threading
+
+
+class SqliteDatabase:
+    SCHEMA = ""
+    AUTOCOMMIT = False
+    PRAGMAS = ()
+
+    def __init__(self, path):
+        self.db_path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn().executescript(self.SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None if self.AUTOCOMMIT else "")
+            conn.execute("PRAGMA journal_mode=WAL")
+            for pragma in self.PRAGMAS:
+                conn.execute(f"PRAGMA {pragma}")
+            self._local.conn = conn
+        return conn
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """Run the block in one ``BEGIN IMMEDIATE`` transaction (``AUTOCOMMIT`` stores)."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
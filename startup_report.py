@@ -0,0 +1,76 @@
+"""Report the import cost of the app's modules.
+
+Each module is imported in a fresh interpreter with ``-X importtime`` after
+the modules in ``--preload`` (Streamlit by default), so the numbers show
+what that module adds on top of what every page already loads::
+
+    python startup_report.py
+    python startup_report.py plotly.graph_objects numpy --repeat 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = [
+    "login",
+    "navbar",
+    "syllabus",
+    "branches",
+    "progress_store",
+    "charts",
+    "checklist",
+    "cse",
+    "ece",
+    "ee",
+    "me",
+    "ce",
+    "plotly.graph_objects",
+]
+
+
+def import_cost_us(module, preload):
+    """Return (self_us, cumulative_us) for importing ``module`` once."""
+    code = "".join(f"import {name}; " for name in preload) + f"import {module}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    # Nested imports are indented, so the least-indented entry is the module's own.
+    best = None
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            depth = len(fields[2]) - len(fields[2].lstrip())
+            if best is None or depth <= best[0]:
+                best = (depth, int(fields[0]), int(fields[1]))
+    if best is not None:
+        return best[1], best[2]
+    return 0, 0  # already imported by the preload
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-module import cost report")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--preload", nargs="*", default=["streamlit"])
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per module")
+    args = parser.parse_args(argv)
+
+    print(f"{'module':<24}{'self ms':>10}{'cumulative ms':>16}")
+    for module in args.modules:
+        try:
+            samples = [import_cost_us(module, args.preload) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{module:<24}  failed: {e}")
+            continue
+        self_ms = statistics.median(s for s, _ in samples) / 1000
+        cumulative_ms = statistics.median(c for _, c in samples) / 1000
+        print(f"{module:<24}{self_ms:>10.1f}{cumulative_ms:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
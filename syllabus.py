@@ -0,0 +1,116 @@
+"""GATE syllabus registry.
+
+The subjects and topics of every branch live in ``syllabus.json`` and are
+loaded once per process. Each topic carries an integer ``id`` that is unique
+within its branch and doubles as its bit position in the user's progress
+bitset, so ids must never be renumbered or reused: a new topic takes the next
+unused id of its branch, wherever it appears in the list.
+"""
+import json
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+SYLLABUS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "syllabus.json")
+
+
+def path_component(name):
+    # Folder name used for a subject/topic under user_data/<user>/notes/<branch>/
+    return name.replace(' ', '_').replace('/', '_')
+
+
+@dataclass(frozen=True)
+class Topic:
+    id: int
+    name: str
+    subject: str
+
+    @property
+    def bit(self):
+        return 1 << self.id
+
+
+@dataclass(frozen=True)
+class Subject:
+    name: str
+    topics: tuple
+    mask: int
+
+    def completed(self, bits):
+        return (bits & self.mask).bit_count()
+
+    def percent(self, bits):
+        return self.completed(bits) / len(self.topics) * 100 if self.topics else 0
+
+
+@dataclass(frozen=True)
+class Branch:
+    code: str
+    name: str
+    label: str
+    title: str
+    subjects: tuple
+    mask: int
+    topics: dict = field(compare=False, repr=False)
+    subjects_by_name: dict = field(compare=False, repr=False)
+
+    def subject(self, name):
+        return self.subjects_by_name.get(name)
+
+    def topic(self, topic_id):
+        return self.topics.get(topic_id)
+
+
+def _build_branch(data):
+    subjects = []
+    topics = {}
+    for subject_data in data["subjects"]:
+        subject_topics = []
+        for topic_data in subject_data["topics"]:
+            topic = Topic(topic_data["id"], topic_data["name"], subject_data["name"])
+            if topic.id in topics:
+                raise ValueError(f"Duplicate topic id {topic.id} in branch {data['code']}")
+            topics[topic.id] = topic
+            subject_topics.append(topic)
+        mask = 0
+        for topic in subject_topics:
+            mask |= topic.bit
+        subjects.append(Subject(subject_data["name"], tuple(subject_topics), mask))
+    branch_mask = 0
+    for subject in subjects:
+        branch_mask |= subject.mask
+    return Branch(
+        code=data["code"],
+        name=data["name"],
+        label=data["label"],
+        title=data["title"],
+        subjects=tuple(subjects),
+        mask=branch_mask,
+        topics=topics,
+        subjects_by_name={subject.name: subject for subject in subjects},
+    )
+
+
+@lru_cache(maxsize=None)
+def load_syllabus(path=SYLLABUS_FILE):
+    """Return ``{branch_code: Branch}`` in display order."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {branch["code"]: _build_branch(branch) for branch in data["branches"]}
+
+
+def branches():
+    return list(load_syllabus().values())
+
+
+def get_branch(code):
+    return load_syllabus()[code.lower()]
+
+
+def bits_from_legacy(branch, raw):
+    """Convert an old ``{"<subject>_<topic>_<branch>": bool}`` dict to a bitset."""
+    bits = 0
+    for topic in branch.topics.values():
+        if raw.get(f"{topic.subject}_{topic.name}_{branch.code}"):
+            bits |= topic.bit
+    return bits
@@ -0,0 +1,197 @@
+"""Generate synthetic users for scale testing.
+
+Writes a working directory with ``user_data/`` and a password list that the
+app, ``cohort_analytics.py`` and ``bench_app.py`` can run against::
+
+    python synth_data.py --users 10000 --notes-per-user 100 --out synthetic
+    cd synthetic && streamlit run ../main.py
+
+Every user studies one main branch (sometimes a second one), has ticked a
+share of its topics drawn from a Beta(2, 3) distribution, earlier subjects
+more than later ones, and has a varying number of PNG notes, mostly on
+ticked topics. ``--layout current`` (default) writes format-2 progress
+files, the blob store with per-user notes indexes and ``users.db``;
+``--layout legacy`` writes the old ``{"<subject>_<topic>_<branch>": bool}``
+progress files, ``notes/<branch>/<Subject>/<Topic>/`` folders and a
+plaintext ``users.json``, so the import paths can be exercised too. The
+current layout lists the passwords in ``synthetic_passwords.json`` instead,
+for logging in as any generated user; the app never reads that file.
+
+The output is the same for the same ``--seed`` and options; each user is
+generated from its own seeded random stream, so ``--workers`` doesn't change
+it.
+"""
+import argparse
+import json
+import os
+import random
+import struct
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from blobstore import BlobStore
+from notes_index import INDEX_FORMAT, topic_key
+from syllabus import branches, path_component
+from user_directory import LEGACY_USERS_FILE, UserDirectory, hash_password
+
+# Notes and progress are dated up to half a year before this moment (2025-06-15)
+BASE_TIME = 1750000000
+HISTORY_SECONDS = 180 * 24 * 3600
+# Share of users per main branch, in syllabus order (cse, ece, ee, ce, me)
+BRANCH_WEIGHTS = (0.40, 0.20, 0.15, 0.13, 0.12)
+SECOND_BRANCH_CHANCE = 0.15
+# Cheap scrypt cost for generated accounts; raised to the app's cost on first login
+SYNTH_SCRYPT_N = 2 ** 10
+PASSWORDS_FILE = "synthetic_passwords.json"
+
+
+def png_bytes(seed, size_kb=0):
+    """Return a valid PNG unique to ``seed``, of roughly ``size_kb`` KB (tiny when 0)."""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    if size_kb:
+        # Noise doesn't compress, so the file is about width * height * 3 bytes.
+        side = max(int((size_kb * 1024 / 3) ** 0.5), 1)
+        noise = random.Random(seed).randbytes(side * side * 3)
+        raw = b"".join(b"\x00" + noise[row * side * 3:(row + 1) * side * 3] for row in range(side))
+        level = 0
+    else:
+        side = 32
+        pixel = struct.pack(">I", seed * 2654435761 & 0xFFFFFFFF)[:3]
+        raw = b"".join(b"\x00" + pixel * side for _row in range(side))
+        level = 6
+    header = struct.pack(">IIBBBBB", side, side, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, level)) + chunk(b"IEND", b"")
+
+
+def user_plan(seed, index, notes_per_user):
+    """Return ``(username, password, {branch_code: bits}, notes)`` for one user.
+
+    ``notes`` is a list of ``(branch_code, topic, note_seed, uploaded)``.
+    """
+    rng = random.Random(f"{seed}:{index}")
+    username = f"user{index:05d}"
+    password = f"pw{rng.randrange(10 ** 6):06d}"
+    all_branches = branches()
+    studied = rng.choices(all_branches, weights=BRANCH_WEIGHTS)
+    if rng.random() < SECOND_BRANCH_CHANCE:
+        studied.append(rng.choice([branch for branch in all_branches if branch not in studied]))
+
+    progress = {}
+    done_topics = []
+    for branch in studied:
+        completion = rng.betavariate(2, 3)
+        bits = 0
+        last = max(len(branch.subjects) - 1, 1)
+        for position, subject in enumerate(branch.subjects):
+            chance = min(completion * (1.4 - 0.8 * position / last), 1.0)
+            for topic in subject.topics:
+                if rng.random() < chance:
+                    bits |= topic.bit
+                    done_topics.append((branch.code, topic))
+        progress[branch.code] = bits
+
+    notes = []
+    count = round(rng.expovariate(1 / notes_per_user)) if notes_per_user else 0
+    candidates = done_topics or [(studied[0].code, topic) for topic in studied[0].topics.values()]
+    for _note in range(count):
+        code, topic = rng.choice(candidates)
+        notes.append((code, topic, rng.getrandbits(48), BASE_TIME - rng.randrange(HISTORY_SECONDS)))
+    return username, password, progress, notes
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def write_user(out, seed, index, notes_per_user, note_kb, layout):
+    username, password, progress, notes = user_plan(seed, index, notes_per_user)
+    user_dir = os.path.join(out, "user_data", username)
+    by_code = {branch.code: branch for branch in branches()}
+
+    for code, bits in progress.items():
+        path = os.path.join(user_dir, f"{code}_progress.json")
+        if layout == "legacy":
+            raw = {f"{topic.subject}_{topic.name}_{code}": bool(bits & topic.bit) for topic in by_code[code].topics.values()}
+        else:
+            raw = {"format": 2, "version": 1, "bits": format(bits, "x")}
+        _write(path, json.dumps(raw).encode("utf-8"))
+
+    if layout == "legacy":
+        for n, (code, topic, note_seed, uploaded) in enumerate(notes):
+            folder = os.path.join(user_dir, "notes", code, path_component(topic.subject), path_component(topic.name))
+            path = os.path.join(folder, f"note_{n:04d}.png")
+            _write(path, png_bytes(note_seed, note_kb))
+            os.utime(path, (uploaded, uploaded))
+    elif notes:
+        _write_indexed_notes(out, username, notes, note_kb)
+
+    password_hash = hash_password(password, n=SYNTH_SCRYPT_N) if layout == "current" else None
+    return username, password, password_hash, len(notes)
+
+
+_blob_stores = {}  # one per output directory and process
+
+
+def _write_indexed_notes(out, username, notes, note_kb):
+    root = os.path.join(out, "user_data", ".blobs")
+    blobs = _blob_stores.get(root)
+    if blobs is None:
+        blobs = _blob_stores[root] = BlobStore(root)
+    topics = {}
+    for n, (code, topic, note_seed, uploaded) in enumerate(notes):
+        data = png_bytes(note_seed, note_kb)
+        blob_id = blobs.add(data)
+        entry = topics.setdefault(topic_key(code, topic.id), {"notes": []})
+        entry["notes"].append({"blob": blob_id, "name": f"note_{n:04d}.png", "size": len(data), "uploaded": uploaded})
+    for entry in topics.values():
+        entry["count"] = len(entry["notes"])
+        entry["bytes"] = sum(note["size"] for note in entry["notes"])
+        entry["updated"] = max(note["uploaded"] for note in entry["notes"])
+    path = os.path.join(out, "user_data", username, "notes_index.json")
+    _write(path, json.dumps({"format": INDEX_FORMAT, "topics": topics}).encode("utf-8"))
+
+
+def generate(out, users, seed=0, notes_per_user=5, note_kb=0, layout="current", workers=1):
+    """Write ``users`` synthetic users under ``out``; return the number of notes."""
+    os.makedirs(os.path.join(out, "user_data"), exist_ok=True)
+    args = [(out, seed, index, notes_per_user, note_kb, layout) for index in range(users)]
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(write_user, *zip(*args), chunksize=64))
+    else:
+        results = [write_user(*arg) for arg in args]
+
+    # Only the legacy layout leaves users.json for the app to import (and delete)
+    passwords_file = LEGACY_USERS_FILE if layout == "legacy" else PASSWORDS_FILE
+    with open(os.path.join(out, passwords_file), "w") as f:
+        json.dump({username: password for username, password, _hash, _notes in results}, f)
+    if layout == "current":
+        directory = UserDirectory(os.path.join(out, "user_data", "users.db"))
+        for username, _password, password_hash, _notes in results:
+            directory.insert_hashed(username, password_hash)
+    return sum(count for _username, _password, _hash, count in results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic StudySync users")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--notes-per-user", type=float, default=5, help="mean; actual counts vary per user")
+    parser.add_argument("--note-kb", type=int, default=0, help="approximate note size (0 = tiny 32x32 images)")
+    parser.add_argument("--layout", choices=["current", "legacy"], default="current")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", default="synthetic")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(os.path.join(args.out, "user_data")):
+        sys.exit(f"{args.out}/user_data already exists; pick an empty --out")
+    notes = generate(args.out, args.users, args.seed, args.notes_per_user, args.note_kb, args.layout, args.workers)
+    print(f"Wrote {args.users} users and {notes} notes to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Two store instances on the same files, standing in for two worker processes."""
+import os
+
+import pytest
+
+from progress_store import EventLogProgressStore, JsonProgressStore
+
+USER = "alice"
+BRANCH = "cse"
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    os.makedirs(tmp_path / USER)
+    return str(tmp_path)
+
+
+def topics(*topic_ids):
+    return sum(1 << topic_id for topic_id in topic_ids)
+
+
+def test_json_flushes_merge_per_topic(data_dir):
+    first = JsonProgressStore(data_dir, flush_delay=60)
+    second = JsonProgressStore(data_dir, flush_delay=60)
+    first.set_topic(USER, BRANCH, 0, True)
+    first.set_topic(USER, BRANCH, 1, True)
+    first.flush()
+    assert second.load_versioned(USER, BRANCH) == (topics(0, 1), 1)
+
+    # Both buffer changes against version 1 before either flushes
+    first.set_topic(USER, BRANCH, 0, False)
+    first.set_topic(USER, BRANCH, 2, True)
+    second.set_topic(USER, BRANCH, 3, True)
+    second.set_topic(USER, BRANCH, 1, False)
+    first.flush()
+    second.flush()
+
+    expected = topics(2, 3)
+    assert first.load_versioned(USER, BRANCH) == (expected, 3)
+    assert second.load_versioned(USER, BRANCH) == (expected, 3)
+    fresh = JsonProgressStore(data_dir, flush_delay=60)
+    assert fresh.load_versioned(USER, BRANCH) == (expected, 3)
+    assert fresh.summary(USER)[BRANCH] == first.summary(USER)[BRANCH]
+
+
+def test_json_same_topic_last_flush_wins(data_dir):
+    first = JsonProgressStore(data_dir, flush_delay=60)
+    second = JsonProgressStore(data_dir, flush_delay=60)
+    first.set_topic(USER, BRANCH, 4, True)
+    second.set_topic(USER, BRANCH, 4, True)
+    second.set_topic(USER, BRANCH, 5, True)
+    second.flush()
+    first.set_topic(USER, BRANCH, 4, False)
+    first.flush()
+
+    assert JsonProgressStore(data_dir).load_versioned(USER, BRANCH) == (topics(5), 2)
+
+
+def test_event_logs_interleave_across_compaction(data_dir):
+    first = EventLogProgressStore(data_dir, compact_every=3)
+    second = EventLogProgressStore(data_dir, compact_every=3)
+    for topic_id in range(4):
+        assert first.set_topic(USER, BRANCH, topic_id, True)
+        assert second.set_topic(USER, BRANCH, topic_id + 10, True)
+    # A change the other store already made is a no-op, not a new event
+    assert not second.set_topic(USER, BRANCH, 3, True)
+
+    expected = topics(0, 1, 2, 3, 10, 11, 12, 13)
+    assert first.load_versioned(USER, BRANCH) == (expected, 8)
+    assert second.load_versioned(USER, BRANCH) == (expected, 8)
+    segments = [name for name in os.listdir(os.path.join(data_dir, USER)) if name.startswith("progress_events.log.")]
+    assert segments
+    assert [event["seq"] for event in second.history(USER, BRANCH)] == list(range(8, 0, -1))
+
+    reloaded = EventLogProgressStore(data_dir, compact_every=3)
+    assert reloaded.load_versioned(USER, BRANCH) == (expected, 8)
+
+
+def test_event_log_undo_after_compaction(data_dir):
+    first = EventLogProgressStore(data_dir, compact_every=2)
+    second = EventLogProgressStore(data_dir, compact_every=2)
+    first.set_topic(USER, BRANCH, 0, True)
+    second.set_topic(USER, BRANCH, 1, True)  # compacts: seq 1-2 move to a segment
+    first.set_topic(USER, BRANCH, 2, True)
+
+    # The other store's latest change is undone, then the one before it,
+    # which is only in the moved-aside segment
+    assert second.undo(USER, BRANCH)["undo"] == 3
+    assert first.undo(USER, BRANCH)["undo"] == 2
+    assert first.load_bits(USER, BRANCH) == topics(0)
+
+    reloaded = EventLogProgressStore(data_dir, compact_every=2)
+    assert reloaded.load_versioned(USER, BRANCH) == (topics(0), 5)
+    assert reloaded.undo(USER, BRANCH)["undo"] == 1
+    assert reloaded.load_bits(USER, BRANCH) == 0
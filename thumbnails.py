@@ -0,0 +1,74 @@
+"""Preview images for uploaded notes.
+
+Thumbnails are stored next to the originals in a ``.thumbs`` folder as
+``<original name>.webp`` (``.jpg`` when Pillow has no WebP support) and are
+rebuilt whenever the original is newer than its thumbnail. Without Pillow,
+or for an image Pillow can't read, the original path is returned instead.
+"""
+import io
+import logging
+import os
+
+from fileio import atomic_write_bytes
+from metrics import span
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow is optional
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+THUMBS_DIR = ".thumbs"
+THUMB_SIZE = (320, 320)
+
+
+def _thumb_format():
+    return "WEBP" if features.check("webp") else "JPEG"
+
+
+def thumbnail_path(image_path):
+    directory, name = os.path.split(image_path)
+    extension = ".webp" if _thumb_format() == "WEBP" else ".jpg"
+    return os.path.join(directory, THUMBS_DIR, name + extension)
+
+
+def make_thumbnail(image_path, size=THUMB_SIZE):
+    """(Re)build the thumbnail of ``image_path`` and return its path."""
+    thumb_format = _thumb_format()
+    with span("thumbnail_build"), Image.open(image_path) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(size)
+        if thumb_format == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGB")
+        buffer = io.BytesIO()
+        image.save(buffer, thumb_format, quality=80)
+    path = thumbnail_path(image_path)
+    atomic_write_bytes(path, buffer.getvalue())
+    return path
+
+
+def get_thumbnail(image_path, size=THUMB_SIZE):
+    """Return a path to show for ``image_path``, building the thumbnail if stale."""
+    if Image is None:
+        return image_path
+    path = thumbnail_path(image_path)
+    try:
+        if os.stat(path).st_mtime_ns >= os.stat(image_path).st_mtime_ns:
+            return path
+    except FileNotFoundError:
+        pass
+    try:
+        return make_thumbnail(image_path, size)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.warning("Could not build thumbnail for %s: %s", image_path, e)
+        return image_path
+
+
+def remove_thumbnail(image_path):
+    if Image is None:
+        return
+    try:
+        os.remove(thumbnail_path(image_path))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,110 @@
+"""Search over the subject and topic names of every branch.
+
+The index is built once per process from the syllabus:
+
+* an inverted index from each lower-cased word to the entries containing it
+* the sorted word list, so every word starting with a prefix is one
+  ``bisect`` away - the last word of a query is usually still being typed
+* a delete-neighbourhood map (each word with any one letter removed), which
+  finds words one typo away without comparing against the whole vocabulary
+
+Every query word must match an entry, exactly, as a prefix or with one typo;
+entries are ranked by how well their words matched, topics named by the
+query ahead of those only in a matching subject, then in syllabus order.
+"""
+import bisect
+import heapq
+import re
+
+from singleton import lazy_singleton
+from syllabus import branches
+
+MAX_RESULTS = 8
+# Query words shorter than this are only matched exactly or as a prefix
+FUZZY_MIN_LENGTH = 4
+EXACT, PREFIX, FUZZY = 3, 2, 1
+# Added when the word is in the entry's own name rather than its subject's
+OWN_BONUS = 1
+
+
+def tokenize(text):
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def _deletes(word):
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+class TopicIndex:
+    def __init__(self, branch_list=None):
+        # (branch, subject, topic or None); a subject entry has no topic
+        self.entries = []
+        postings = {}
+        for branch in branch_list if branch_list is not None else branches():
+            for subject in branch.subjects:
+                self._add(postings, (branch, subject, None), subject.name)
+                for topic in subject.topics:
+                    # Topics also answer to their subject's words ("coa
+                    # pipelining"), ranked below matches on their own name
+                    self._add(postings, (branch, subject, topic), topic.name, subject.name)
+        self.postings = postings
+        self.words = sorted(postings)
+        self.neighbours = {}
+        for word in self.words:
+            if len(word) >= FUZZY_MIN_LENGTH - 1:
+                for variant in _deletes(word) | {word}:
+                    self.neighbours.setdefault(variant, []).append(word)
+
+    def _add(self, postings, entry, name, inherited=""):
+        entry_id = len(self.entries)
+        self.entries.append(entry)
+        own = set(tokenize(name))
+        for word in own:
+            postings.setdefault(word, []).append((entry_id, OWN_BONUS))
+        for word in set(tokenize(inherited)) - own:
+            postings.setdefault(word, []).append((entry_id, 0))
+
+    def _word_matches(self, term):
+        """Return ``{word: weight}`` for vocabulary words matching ``term``."""
+        matches = {}
+        if len(term) >= FUZZY_MIN_LENGTH:
+            for variant in _deletes(term) | {term}:
+                for word in self.neighbours.get(variant, ()):
+                    matches[word] = FUZZY
+        start = bisect.bisect_left(self.words, term)
+        for word in self.words[start:]:
+            if not word.startswith(term):
+                break
+            matches[word] = PREFIX
+        if term in self.postings:
+            matches[term] = EXACT
+        return matches
+
+    def _term_scores(self, term):
+        # entry id -> best weight of any of its words for this query term
+        scores = {}
+        for word, weight in self._word_matches(term).items():
+            for entry_id, bonus in self.postings[word]:
+                if scores.get(entry_id, 0) < weight + bonus:
+                    scores[entry_id] = weight + bonus
+        return scores
+
+    def search(self, query, limit=MAX_RESULTS):
+        """Return up to ``limit`` ``(branch, subject, topic or None)`` matches, best first."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        totals = None
+        for term in terms:
+            scores = self._term_scores(term)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {entry_id: totals[entry_id] + score for entry_id, score in scores.items() if entry_id in totals}
+            if not totals:
+                return []
+        best = heapq.nsmallest(limit, totals, key=lambda entry_id: (-totals[entry_id], entry_id))
+        return [self.entries[entry_id] for entry_id in best]
+
+
+get_topic_index = lazy_singleton(TopicIndex)
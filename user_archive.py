@@ -0,0 +1,351 @@
+"""Export and import all of one user's data as a single zip archive.
+
+An archive holds the account (username and password hash), the progress
+bitset of every branch, the notes index with each referenced note image
+once, the revision schedule and the study-velocity rollups::
+
+    manifest.json            written last: format, username and the size
+                             and SHA-256 of every other member
+    account.json
+    progress/<branch>.json   {"format": 2, "bits": "<hex>"}, any backend
+    notes_index.json
+    blobs/<sha256><ext>      note images, stored uncompressed
+    revision.json
+    velocity.json
+
+Members are streamed in ``CHUNK_SIZE`` pieces on both sides, so memory use
+doesn't grow with the size of a user's notes. Export can write to a pipe
+(``-o -``); import needs a seekable file to read the manifest first.
+
+Import checks every member against the manifest before using it. The
+checksums aren't signed, so the username, progress and notes index are also
+validated (a plain folder name, topics that exist in the syllabus, complete
+note entries) before anything is written. Each step is idempotent: notes already attached are skipped, images already in
+the blob store only gain a reference, and rows already present are kept.
+An interrupted import is resumed by running it again. The account is
+created last, so nobody can log in to a half-imported user.
+
+    python user_archive.py export alice -o alice.zip
+    python user_archive.py verify alice.zip
+    python user_archive.py import alice.zip [--as alice2]
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import zipfile
+
+from blobstore import CHUNK_SIZE, IMAGE_SIGNATURES, get_blob_store
+from notes_index import get_notes_index
+from progress_store import JSON_FORMAT, get_store
+from revision import get_scheduler
+from syllabus import branches
+from user_directory import get_user_directory
+from velocity import get_velocity_tracker
+
+ARCHIVE_FORMAT = 1
+MANIFEST = "manifest.json"
+ACCOUNT = "account.json"
+NOTES_INDEX = "notes_index.json"
+REVISION = "revision.json"
+VELOCITY = "velocity.json"
+BLOB_ID = re.compile(r"[0-9a-f]{64}(%s)" % "|".join(re.escape(ext) for ext in sorted(set(IMAGE_SIGNATURES.values()))))
+NOTE_FIELDS = {"blob": str, "name": str, "size": int, "uploaded": int}
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+def _progress_member(branch):
+    return f"progress/{branch}.json"
+
+
+def _blob_member(blob_id):
+    return f"blobs/{blob_id}"
+
+
+def export_user(username, fileobj, store=None):
+    """Write ``username``'s archive to the binary file object ``fileobj``."""
+    account = get_user_directory().account(username)
+    if account is None:
+        raise ArchiveError(f"Unknown user: {username}")
+    store = store or get_store()
+    blobs = get_blob_store()
+    files = {}
+
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as archive:
+        def put_json(name, data):
+            payload = json.dumps(data).encode("utf-8")
+            archive.writestr(name, payload)
+            files[name] = {"size": len(payload), "sha256": hashlib.sha256(payload).hexdigest()}
+
+        put_json(ACCOUNT, account)
+        for branch in branches():
+            bits = store.load_bits(username, branch.code)
+            if bits:
+                put_json(_progress_member(branch.code), {"format": JSON_FORMAT, "bits": f"{bits:x}"})
+
+        # Notes whose image has gone missing on disk are left out rather than
+        # exported as references the importer could never resolve.
+        topics = {}
+        for key, entry in get_notes_index().topics(username).items():
+            notes = [note for note in entry["notes"] if blobs.exists(note["blob"])]
+            if notes:
+                topics[key] = dict(entry, notes=notes)
+        put_json(NOTES_INDEX, topics)
+
+        for blob_id in sorted({note["blob"] for entry in topics.values() for note in entry["notes"]}):
+            name = _blob_member(blob_id)
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_STORED  # PNG/JPEG don't compress further
+            digest = hashlib.sha256()
+            size = 0
+            with open(blobs.path(blob_id), "rb") as src, archive.open(info, "w", force_zip64=True) as dst:
+                while True:
+                    chunk = src.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    size += len(chunk)
+                    dst.write(chunk)
+            files[name] = {"size": size, "sha256": digest.hexdigest()}
+
+        put_json(REVISION, get_scheduler().cards(username))
+        put_json(VELOCITY, get_velocity_tracker().rollups(username))
+
+        manifest = {"format": ARCHIVE_FORMAT, "username": username, "exported": int(time.time()), "files": files}
+        archive.writestr(MANIFEST, json.dumps(manifest, indent=1))
+    return manifest
+
+
+def export_to_tempfile(username):
+    """Return ``username``'s archive as a temp file opened for reading.
+
+    ``st.download_button`` only accepts plain read-only files, so the archive
+    is written to a named temp file and reopened. The name is removed at once
+    where the OS allows it (not on Windows); the data lives until it's closed.
+    """
+    fd, path = tempfile.mkstemp(prefix="studysync-export-", suffix=".zip")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            export_user(username, f)
+        archive = open(path, "rb")
+    except BaseException:
+        os.remove(path)
+        raise
+    with contextlib.suppress(OSError):
+        os.remove(path)
+    return archive
+
+
+def read_manifest(archive):
+    try:
+        manifest = json.loads(archive.read(MANIFEST))
+    except KeyError:
+        raise ArchiveError("Not a StudySync archive: manifest.json is missing")
+    if manifest.get("format") != ARCHIVE_FORMAT:
+        raise ArchiveError(f"Unsupported archive format: {manifest.get('format')}")
+    return manifest
+
+
+def _check(manifest, name, size, sha256):
+    expected = manifest["files"].get(name)
+    if expected is None:
+        raise ArchiveError(f"{name} is not listed in the manifest")
+    if expected["size"] != size or expected["sha256"] != sha256:
+        raise ArchiveError(f"{name} does not match its checksum")
+
+
+def _hash_member(archive, name):
+    digest = hashlib.sha256()
+    size = 0
+    with archive.open(name) as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+    return size, digest.hexdigest()
+
+
+def _read_json(archive, manifest, name, default=None):
+    if name not in manifest["files"]:
+        return default
+    data = archive.read(name)
+    _check(manifest, name, len(data), hashlib.sha256(data).hexdigest())
+    return json.loads(data)
+
+
+def verify_archive(path):
+    """Check every member against the manifest; returns the manifest."""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            manifest = read_manifest(archive)
+            missing = set(manifest["files"]) - set(archive.namelist())
+            if missing:
+                raise ArchiveError(f"Missing from archive: {', '.join(sorted(missing))}")
+            for name in manifest["files"]:
+                _check(manifest, name, *_hash_member(archive, name))
+    except zipfile.BadZipFile as e:
+        raise ArchiveError(f"Damaged archive: {e}")
+    return manifest
+
+
+def _check_username(username):
+    # The name becomes a folder under user_data/; archives aren't trusted.
+    if (not isinstance(username, str) or not username or username.startswith(".")
+            or "/" in username or "\\" in username or ".." in username):
+        raise ArchiveError(f"Invalid username: {username!r}")
+
+
+def _read_progress(archive, manifest):
+    # {branch code: bits} for every branch in the archive
+    progress = {}
+    for branch in branches():
+        member = _progress_member(branch.code)
+        data = _read_json(archive, manifest, member)
+        if data:
+            try:
+                progress[branch.code] = int(data["bits"], 16) & branch.mask
+            except (KeyError, TypeError, ValueError):
+                raise ArchiveError(f"{member} is malformed")
+    return progress
+
+
+def _read_notes_index(archive, manifest):
+    # [(branch code, topic id, notes)], checked against the syllabus
+    by_code = {branch.code: branch for branch in branches()}
+    topics = _read_json(archive, manifest, NOTES_INDEX, {})
+    if not isinstance(topics, dict):
+        raise ArchiveError(f"{NOTES_INDEX} is malformed")
+    checked = []
+    for key, entry in topics.items():
+        code, _sep, topic_id = key.partition("/")
+        branch = by_code.get(code)
+        if branch is None or not topic_id.isdigit() or int(topic_id) not in branch.topics:
+            raise ArchiveError(f"{NOTES_INDEX}: unknown topic {key!r}")
+        notes = entry.get("notes") if isinstance(entry, dict) else None
+        if not isinstance(notes, list):
+            raise ArchiveError(f"{NOTES_INDEX}: {key} has no note list")
+        for note in notes:
+            if not isinstance(note, dict) or any(
+                not isinstance(note.get(field), kind) for field, kind in NOTE_FIELDS.items()
+            ) or not BLOB_ID.fullmatch(note["blob"]):
+                raise ArchiveError(f"{NOTES_INDEX}: {key} has a malformed note")
+        checked.append((code, int(topic_id), [{field: note[field] for field in NOTE_FIELDS} for note in notes]))
+    return checked
+
+
+def _attach_blob(archive, manifest, blobs, blob_id):
+    # Content-addressed: an image already stored here only needs a reference.
+    if blobs.retain(blob_id):
+        return
+    name = _blob_member(blob_id)
+    if name not in manifest["files"]:
+        raise ArchiveError(f"{name} is not listed in the manifest")
+    with archive.open(name) as f:
+        stored_id, size, _added = blobs.add_stream(f)
+    if stored_id != blob_id or size != manifest["files"][name]["size"]:
+        blobs.release(stored_id)
+        raise ArchiveError(f"{name} does not match its checksum")
+
+
+def import_user(path, username=None, store=None):
+    """Import an archive, as ``username`` if given; returns a summary dict.
+
+    Safe to re-run after an interruption: finished steps are skipped.
+    """
+    store = store or get_store()
+    directory = get_user_directory()
+    try:
+        with zipfile.ZipFile(path) as archive:
+            manifest = read_manifest(archive)
+            username = username or manifest.get("username")
+            _check_username(username)
+            account = _read_json(archive, manifest, ACCOUNT)
+            if not isinstance(account, dict) or not isinstance(account.get("password_hash"), str):
+                raise ArchiveError("Archive has no account")
+            existing = directory.account(username)
+            if existing and existing["password_hash"] != account["password_hash"]:
+                raise ArchiveError(f"A different user called {username} already exists")
+
+            # Everything written below is checked first, so a bad archive
+            # fails before it changes anything.
+            progress = _read_progress(archive, manifest)
+            topics = _read_notes_index(archive, manifest)
+
+            topics_done = 0
+            for branch, bits in progress.items():
+                store.set_bits(username, branch, bits)
+                topics_done += bits.bit_count()
+            store.flush()
+
+            blobs = get_blob_store()
+            index = get_notes_index()
+            notes_added = notes_skipped = 0
+            for branch, topic_id, notes in topics:
+                attached = {note["blob"] for note in index.notes(username, branch, topic_id)}
+                for note in notes:
+                    if note["blob"] in attached:
+                        notes_skipped += 1
+                        continue
+                    _attach_blob(archive, manifest, blobs, note["blob"])
+                    if index.add(username, branch, topic_id, note):
+                        notes_added += 1
+                    else:
+                        blobs.release(note["blob"])
+
+            get_scheduler().restore_cards(username, _read_json(archive, manifest, REVISION, []))
+            get_velocity_tracker().restore_rollups(username, _read_json(archive, manifest, VELOCITY, {}))
+    except zipfile.BadZipFile as e:
+        raise ArchiveError(f"Damaged archive: {e}")
+
+    directory.insert_hashed(username, account["password_hash"], account.get("created"))
+    return {"username": username, "topics": topics_done, "notes_added": notes_added, "notes_skipped": notes_skipped}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or import one user's StudySync data")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="write a user's archive")
+    export.add_argument("username")
+    export.add_argument("-o", "--out", help="archive path, or - for stdout (default: studysync-<user>.zip)")
+    verify = sub.add_parser("verify", help="check an archive against its manifest")
+    verify.add_argument("archive")
+    restore = sub.add_parser("import", help="import (or resume importing) an archive")
+    restore.add_argument("archive")
+    restore.add_argument("--as", dest="username", help="import under a different username")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "export":
+            out = args.out or f"studysync-{args.username}.zip"
+            if out == "-":
+                manifest = export_user(args.username, sys.stdout.buffer)
+            else:
+                with open(out, "wb") as f:
+                    manifest = export_user(args.username, f)
+            size = sum(entry["size"] for entry in manifest["files"].values())
+            print(f"Exported {args.username}: {len(manifest['files'])} files, {size} bytes", file=sys.stderr)
+        elif args.command == "verify":
+            manifest = verify_archive(args.archive)
+            print(f"{args.archive}: {manifest['username']}, {len(manifest['files'])} files OK")
+        elif args.command == "import":
+            result = import_user(args.archive, args.username)
+            print(
+                f"Imported {result['username']}: {result['topics']} completed topics, "
+                f"{result['notes_added']} notes added, {result['notes_skipped']} already present"
+            )
+    except ArchiveError as e:
+        raise SystemExit(f"error: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Registered users and their password hashes.
+
+Users live in ``user_data/users.db`` (SQLite, WAL mode), so a login looks up
+one row by primary key instead of parsing every account, and signup is a
+single ``INSERT ... ON CONFLICT DO NOTHING`` that two concurrent signups
+can't both win.
+
+Passwords are hashed with scrypt. The cost parameters are stored with each
+hash, so raising ``STUDYSYNC_SCRYPT_N`` applies to new accounts at once and
+to existing ones on their next successful login. Hashing runs on a small
+worker pool rather than the Streamlit script thread; ``hashlib.scrypt``
+releases the GIL, so other sessions keep rendering during a burst of logins,
+and the pool size caps how much CPU those logins take.
+
+The plaintext ``users.json`` of older versions is imported, hashed, when
+the directory is opened, and deleted once every account is in the database.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from singleton import lazy_singleton
+from sqlite_db import SqliteDatabase
+
+USER_DATA_DIR = "user_data"
+USERS_DB = os.path.join(USER_DATA_DIR, "users.db")
+LEGACY_USERS_FILE = "users.json"
+
+SCRYPT_N = int(os.environ.get("STUDYSYNC_SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.environ.get("STUDYSYNC_SCRYPT_R", "8"))
+SCRYPT_P = int(os.environ.get("STUDYSYNC_SCRYPT_P", "1"))
+KDF_WORKERS = int(os.environ.get("STUDYSYNC_KDF_WORKERS", "2"))
+
+_kdf_pool = ThreadPoolExecutor(max_workers=KDF_WORKERS, thread_name_prefix="kdf")
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+def hash_password(password, n=None, r=None, p=None):
+    """Return ``scrypt$n$r$p$<salt>$<hash>`` for ``password``."""
+    n, r, p = n or SCRYPT_N, r or SCRYPT_R, p or SCRYPT_P
+    salt = secrets.token_bytes(16)
+    digest = hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p, maxmem=128 * n * r * 2)
+    return f"scrypt${n}${r}${p}${_b64(salt)}${_b64(digest)}"
+
+
+def check_password(password, stored):
+    _scheme, n, r, p, salt, expected = stored.split("$")
+    n, r, p = int(n), int(r), int(p)
+    digest = hashlib.scrypt(password.encode("utf-8"), salt=base64.b64decode(salt), n=n, r=r, p=p, maxmem=128 * n * r * 2)
+    return hmac.compare_digest(digest, base64.b64decode(expected))
+
+
+def needs_rehash(stored):
+    return stored.split("$")[1:4] != [str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P)]
+
+
+class UserDirectory(SqliteDatabase):
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS users (
+            username      TEXT PRIMARY KEY,
+            password_hash TEXT NOT NULL,
+            created       INTEGER NOT NULL
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path=USERS_DB):
+        super().__init__(path)
+        # Hash of a random password, checked for unknown users so that a
+        # failed login takes as long whether or not the user exists.
+        self._dummy_hash = _kdf_pool.submit(hash_password, secrets.token_hex(8)).result()
+
+    def _hash_of(self, username):
+        row = self._conn().execute(
+            "SELECT password_hash FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def exists(self, username):
+        return self._hash_of(username) is not None
+
+    def verify(self, username, password):
+        """Check a login; blocks the caller, but not other sessions, while hashing."""
+        stored = self._hash_of(username)
+        ok = _kdf_pool.submit(check_password, password, stored or self._dummy_hash).result()
+        if not (ok and stored):
+            return False
+        if needs_rehash(stored):
+            new_hash = _kdf_pool.submit(hash_password, password).result()
+            with self._conn() as conn:
+                conn.execute(
+                    "UPDATE users SET password_hash = ? WHERE username = ? AND password_hash = ?",
+                    (new_hash, username, stored),
+                )
+        return True
+
+    def create(self, username, password):
+        """Register a user; returns False if the name is already taken."""
+        if self.exists(username):
+            return False  # skip the hashing work for the common case
+        password_hash = _kdf_pool.submit(hash_password, password).result()
+        return self.insert_hashed(username, password_hash)
+
+    def insert_hashed(self, username, password_hash, created=None):
+        with self._conn() as conn:
+            cursor = conn.execute(
+                "INSERT INTO users (username, password_hash, created) VALUES (?, ?, ?) "
+                "ON CONFLICT (username) DO NOTHING",
+                (username, password_hash, int(created or time.time())),
+            )
+        return cursor.rowcount == 1
+
+    def account(self, username):
+        """Return ``{"username", "password_hash", "created"}``, or None."""
+        row = self._conn().execute(
+            "SELECT password_hash, created FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"username": username, "password_hash": row[0], "created": row[1]}
+
+
+def import_legacy_users(directory, path=LEGACY_USERS_FILE):
+    """Hash and insert the accounts of a plaintext ``{username: password}`` file, then delete it.
+
+    Accounts that already exist are skipped before any hashing, so an
+    import interrupted before the delete only finishes the rest on the next
+    start.
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, "r") as f:
+        users = {username: password for username, password in json.load(f).items() if not directory.exists(username)}
+    hashes = _kdf_pool.map(hash_password, users.values())
+    imported = sum(directory.insert_hashed(username, password_hash) for username, password_hash in zip(users, hashes))
+    os.remove(path)
+    return imported
+
+
+def _open_user_directory():
+    directory = UserDirectory(os.environ.get("STUDYSYNC_USERS_DB", USERS_DB))
+    import_legacy_users(directory)
+    return directory
+
+
+get_user_directory = lazy_singleton(_open_user_directory)
@@ -0,0 +1,142 @@
+"""Study velocity: daily completion counts, streaks and a projected finish date.
+
+Every tick or untick updates two small rollups in ``user_data/velocity.db``
+(SQLite, WAL mode) instead of being recomputed from history:
+
+* ``daily``   - topics ticked and unticked per user, branch and day
+* ``streaks`` - current and longest run of consecutive days with a tick
+
+Rolling 7/30-day velocity is a range read of at most 30 ``daily`` rows, and
+the projection divides the topics still open by the 30-day rate.
+"""
+import datetime
+import os
+
+from singleton import lazy_singleton
+from sqlite_db import SqliteDatabase
+
+USER_DATA_DIR = "user_data"
+VELOCITY_DB = os.path.join(USER_DATA_DIR, "velocity.db")
+CHART_DAYS = 30
+
+
+def today():
+    return datetime.date.today().toordinal()
+
+
+class VelocityTracker(SqliteDatabase):
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS daily (
+            username TEXT NOT NULL,
+            branch   TEXT NOT NULL,
+            day      INTEGER NOT NULL,
+            done     INTEGER NOT NULL DEFAULT 0,
+            undone   INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (username, branch, day)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS streaks (
+            username TEXT NOT NULL,
+            branch   TEXT NOT NULL,
+            current  INTEGER NOT NULL,
+            longest  INTEGER NOT NULL,
+            last_day INTEGER NOT NULL,
+            PRIMARY KEY (username, branch)
+        ) WITHOUT ROWID;
+    """
+
+    def record(self, username, branch, done, day=None):
+        """Count one tick (``done``) or untick on ``day`` (default today)."""
+        day = day or today()
+        column = "done" if done else "undone"
+        with self._conn() as conn:
+            conn.execute(
+                f"INSERT INTO daily (username, branch, day, {column}) VALUES (?, ?, ?, 1) "
+                f"ON CONFLICT (username, branch, day) DO UPDATE SET {column} = {column} + 1",
+                (username, branch, day),
+            )
+            if not done:
+                return
+            row = conn.execute(
+                "SELECT current, longest, last_day FROM streaks WHERE username = ? AND branch = ?",
+                (username, branch),
+            ).fetchone()
+            current, longest, last_day = row or (0, 0, None)
+            if last_day == day:
+                return
+            current = current + 1 if last_day == day - 1 else 1
+            conn.execute(
+                "INSERT INTO streaks (username, branch, current, longest, last_day) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (username, branch) DO UPDATE SET "
+                "current = excluded.current, longest = excluded.longest, last_day = excluded.last_day",
+                (username, branch, current, max(longest, current), day),
+            )
+
+    def daily(self, username, branch, days=CHART_DAYS, day=None):
+        """Return net completions for each of the last ``days`` days, oldest first."""
+        day = day or today()
+        rows = self._conn().execute(
+            "SELECT day, done - undone FROM daily WHERE username = ? AND branch = ? AND day > ? AND day <= ?",
+            (username, branch, day - days, day),
+        )
+        by_day = dict(rows)
+        return [by_day.get(d, 0) for d in range(day - days + 1, day + 1)]
+
+    def streak(self, username, branch, day=None):
+        """Return ``(current, longest)``; a streak survives until a full day is missed."""
+        day = day or today()
+        row = self._conn().execute(
+            "SELECT current, longest, last_day FROM streaks WHERE username = ? AND branch = ?",
+            (username, branch),
+        ).fetchone()
+        if row is None:
+            return 0, 0
+        current, longest, last_day = row
+        return (current if last_day >= day - 1 else 0), longest
+
+    def stats(self, username, branch, remaining, day=None):
+        """Return streaks, 7/30-day velocity (topics per day) and the projected finish date."""
+        day = day or today()
+        series = self.daily(username, branch, CHART_DAYS, day)
+        velocity_7 = sum(series[-7:]) / 7
+        velocity_30 = sum(series) / CHART_DAYS
+        current, longest = self.streak(username, branch, day)
+        finish = None
+        if remaining == 0:
+            finish = datetime.date.fromordinal(day)
+        elif velocity_30 > 0:
+            finish = datetime.date.fromordinal(day + int(-(-remaining // velocity_30)))
+        return {
+            "series": series,
+            "streak": current,
+            "longest_streak": longest,
+            "velocity_7": velocity_7,
+            "velocity_30": velocity_30,
+            "finish": finish,
+        }
+
+    def rollups(self, username):
+        """Return a user's ``{"daily": [...], "streaks": [...]}`` rows for export."""
+        conn = self._conn()
+        return {
+            "daily": [list(row) for row in conn.execute(
+                "SELECT branch, day, done, undone FROM daily WHERE username = ? ORDER BY branch, day", (username,)
+            )],
+            "streaks": [list(row) for row in conn.execute(
+                "SELECT branch, current, longest, last_day FROM streaks WHERE username = ? ORDER BY branch", (username,)
+            )],
+        }
+
+    def restore_rollups(self, username, rollups):
+        """Insert exported rows, keeping any the user already has."""
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT INTO daily VALUES (?, ?, ?, ?, ?) ON CONFLICT DO NOTHING",
+                [(username, *row) for row in rollups.get("daily", [])],
+            )
+            conn.executemany(
+                "INSERT INTO streaks VALUES (?, ?, ?, ?, ?) ON CONFLICT DO NOTHING",
+                [(username, *row) for row in rollups.get("streaks", [])],
+            )
+
+
+get_velocity_tracker = lazy_singleton(lambda: VelocityTracker(os.environ.get("STUDYSYNC_VELOCITY_DB", VELOCITY_DB)))